@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, render_template, request, jsonify, session, Response, send_file
 from flask_pymongo import PyMongo
 from beam_logic import (
     calculate_all,
@@ -15,21 +15,40 @@ from suggestions import (
     langchain_suggestions,
     langchain_error_explanation,
 )
-from chatbot import structural_chatbot_response
+from chatbot import chatbot_answer, stream_chatbot_answer
+from reinforcement import design_summary
+from fiber_section import fiber_summary
+from cost_engine import get_rates, beam_costs, project_costs, bill_of_quantities
+from dynamics import beam_properties, modal_analysis, stream_time_history, harmonic_load, footfall_load
+from dashboard import record_project, read_summaries, aggregate_dashboard
+from singleflight import SingleFlight, canonical_key
+from pipeline import run_pipeline, normalize_inputs, load_params, INPUT_DEFAULTS
+from profile_export import get_or_create_profile, decimated_view, profile_path
+from design_tables import design_lookup as table_lookup
+from design_rules import check_arrays, check_beams, summarize, rule_names, allowable_stress, deflection_limit as permissible_deflection
+from live import compute_update, live_stats
+from token_cache import TokenVerifier
+from result_store import save_project, load_project, project_view_stages
 import numpy as np
 import datetime
+import json
 import traceback
 import uuid
 import os
 from dotenv import load_dotenv
 import firebase_admin
 from firebase_admin import credentials, auth
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 app.secret_key = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
+# Behind Render/Railway's proxy set PROXY_COUNT=1 so remote_addr is the client's address
+proxy_count = int(os.getenv("PROXY_COUNT", "0"))
+if proxy_count:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_count, x_proto=proxy_count)
 
 # 🔌 MongoDB connection - uses environment variable or defaults to local
 mongo_uri = os.getenv("MONGO_URI", "")
@@ -67,6 +86,20 @@ if firebase_creds:
         print(f"⚠️ Firebase initialization failed: {e}")
         print("   Continuing without Firebase authentication verification")
 
+# 🔑 ID tokens are verified locally against background-refreshed signing keys and
+# cached until they expire; the Admin SDK is the fallback while keys are missing
+token_verifier = None
+if firebase_initialized:
+    firebase_project_id = os.getenv("FIREBASE_PROJECT_ID") or firebase_admin.get_app().project_id
+    if firebase_project_id:
+        token_verifier = TokenVerifier(firebase_project_id, fallback=lambda id_token: auth.verify_id_token(id_token))
+        token_verifier.start()
+    else:
+        print("⚠️ Firebase project id unknown - ID tokens are verified by the Admin SDK on every request")
+
+# ♻️ Coalesce identical /calculate posts; results are reused for a short retry window
+calculation_flight = SingleFlight(window=float(os.getenv("CALCULATE_DEDUP_WINDOW", "2")))
+
 def safe_float(value, default=0.0):
     try:
         if isinstance(value, list):
@@ -84,249 +117,535 @@ def calculate():
     try:
         print("✅ Form submitted")
         form = request.form
-        load_type = form.get("loadType", "")
-        building_type = form.get("buildingType", "residential")
-        length = safe_float(form.get("length")) 
-
-        params = {k: v if isinstance(v, str) else v[0] for k, v in form.items()}
-        print(f"📥 Received params: {params}")
-
-        b = safe_float(params.get("b")) / 1000 
-        d = safe_float(params.get("d")) / 1000 
-
-        material_key = params.get("material", "M20")
-        material = get_material_properties(material_key)
-        E_modulus = material.get("E", 25e9) 
-
-        if load_type == "udl":
-            w = safe_float(params.get("w")) * 1000 
-            params["w"] = w
-        elif load_type in ["point_center", "point_anywhere"]:
-            P = safe_float(params.get("P")) * 1000
-            params["P"] = P
-        elif load_type == "uvl":
-            w_max = safe_float(params.get("w_max")) * 1000 
-            params["w_max"] = w_max
-        elif load_type == "moment":
-            M_applied = safe_float(params.get("M_applied")) * 1000 
-            params["M_applied"] = M_applied
-
-        section = rectangular_section(b, d)
-
-        val = 0.0
-        if load_type == "udl":
-            val = params.get("w", 0)
-        elif load_type in ["point_center", "point_anywhere"]:
-            val = params.get("P", 0)
-        elif load_type == "uvl":
-            val = params.get("w_max", 0)
-        elif load_type == "moment":
-            val = params.get("M_applied", 0)
-
-        results = None
-        dl = il = wl = None
-
-        if request.method == "POST":
-            limit_state = request.form.get("limit_state")
-
-            # Inputs
-            length = safe_float(request.form.get("length"))
-            b = safe_float(request.form.get("b")) / 1000  # convert mm→m
-            d = safe_float(request.form.get("d")) / 1000
-            P = safe_float(request.form.get("P"))
-            w = safe_float(request.form.get("w"))
-            w_max = safe_float(request.form.get("w_max"))
-            M_applied = safe_float(request.form.get("M_applied"))
-
-            # Calculate loads
-            dl, il, wl = calculate_loads(length, b, d, P, w, w_max, M_applied)
-
-            # Factored loads
-            results = factored_loads(limit_state, dl, il, wl)
-        
-        volume_concrete = b * d * length 
-        steel_weight = volume_concrete * 120 
-        cost_concrete = volume_concrete * 6000 
-        cost_steel = steel_weight * 65 
-        binding_wire_weight = steel_weight * 0.01
-        binding_wire_cost = binding_wire_weight * 72
-        total_cost = cost_concrete + cost_steel + binding_wire_cost
-
-        R1, R2, M_max, x_vals, V_vals, M_vals, deflection_vals, max_deflection = calculate_all(
-            length, load_type, params, E=E_modulus, I=section["I"]
-        )
-        # R1, R2, M_max, delta_max, x_vals, V_vals, M_vals, deflection_vals = calculate_all(length, load_type, params)
-        
-        stress, stress_ok = stress_check(M_max * 1e6, section["Z"] * 1e9, material.get("fck", 0))
-        stress = round(stress, 2)
-        stress_warning = ""
-        stress_fix = ""
-        if not stress_ok:
-            stress_warning = f"⚠️ Warning: Stress {stress} MPa exceeds allowable limit of {material.get('fck', 0)} MPa!"
-            stress_fix = suggest_fix_for_stress_warning(stress, material_key)
-        else:
-            stress_fix = "✅ Stress is within acceptable limits."
-
-        stress_ratio = round(stress / material.get("fck", 1), 2)
-
-        stress_profile = {
-            "depths": np.linspace(0, d * 1000, 10).tolist(),
-            "stresses": np.linspace(0, stress, 10).tolist()
-        }
-
-        deflection = max_deflection
-        deflection_limit = length * 1000 / 250 
-        deflection_ok = deflection <= deflection_limit
-
-        deflection_warning = ""
-        deflection_fix = ""
-        if not deflection_ok:
-            deflection_warning = f"⚠️ Warning: Deflection {round(deflection, 2)} mm exceeds limit of {round(deflection_limit, 2)} mm."
-            deflection_fix = suggest_fix_for_deflection_warning(deflection, deflection_limit)
-        else:
-            deflection_fix = "✅ Deflection is within acceptable limits."
+        # Identical concurrent posts (shared links, client retries) share one computation
+        context = calculation_flight.do(canonical_key(form), lambda: _calculate_context(form))
+        # Saved per request, outside the shared computation, so every user gets their own record
+        context = {**context, "beam_data": _save_calculation(context["beam_data"])}
+        return render_template('index.html', **context)
 
-        deflection_ratio = round(deflection / deflection_limit, 2)
+    except Exception as e:
+        print("❌ ERROR:", e)
+        traceback.print_exc()
+        return render_template('index.html', error=f"Calculation Error: {e}")
 
-        # AI suggestions with timeout protection
-        ai_error_explanation = ""
-        ai_response = ""
-        
-        # Try AI suggestions with timeout (non-blocking)
+def _save_calculation(beam_data):
+    """Save this request's project: results once per distinct input set, plus a reference."""
+    beam_data = {**beam_data, "_id": str(uuid.uuid4()), "timestamp": datetime.datetime.utcnow()}
+    # 💾 Only if MongoDB is configured
+    if mongo:
         try:
-            if not stress_ok or not deflection_ok:
-                # Use threading to prevent blocking
-                import threading
-                ai_result = [None]
-                
-                def get_ai_explanation():
-                    try:
-                        ai_result[0] = langchain_error_explanation(
-                            length=length,
-                            b=b,
-                            d=d,
-                            material=material_key,
-                            stress=stress,
-                            stress_ok=stress_ok,
-                            deflection=deflection,
-                            deflection_ok=deflection_ok,
-                            load_type=load_type
-                        )
-                    except:
-                        pass
-                
-                thread = threading.Thread(target=get_ai_explanation)
-                thread.daemon = True
-                thread.start()
-                thread.join(timeout=5)  # 5 second timeout
-                ai_error_explanation = ai_result[0] if ai_result[0] else ""
+            beam_data["result_id"], _ = save_project(mongo.db, beam_data, session.get("user_id"))
+            record_project(mongo.db, beam_data)
         except Exception as e:
-            print(f"⚠️ AI error explanation failed: {e}")
-            ai_error_explanation = ""
-        
-        # AI general suggestions with timeout
-        try:
+            print(f"⚠️ MongoDB save failed (non-critical): {e}")
+            # Continue without saving - calculation results still work
+    return beam_data
+
+def _calculate_context(form):
+    """Run the full calculation for a submitted form and return the template context."""
+    load_type = form.get("loadType", "")
+    building_type = form.get("buildingType", "residential")
+    length = safe_float(form.get("length")) 
+
+    params = {k: v if isinstance(v, str) else v[0] for k, v in form.items()}
+    print(f"📥 Received params: {params}")
+
+    b = safe_float(params.get("b")) / 1000 
+    d = safe_float(params.get("d")) / 1000 
+
+    material_key = params.get("material", "M20")
+    material = get_material_properties(material_key)
+    E_modulus = material.get("E", 25e9) 
+
+    if load_type == "udl":
+        w = safe_float(params.get("w")) * 1000 
+        params["w"] = w
+    elif load_type in ["point_center", "point_anywhere"]:
+        P = safe_float(params.get("P")) * 1000
+        params["P"] = P
+    elif load_type == "uvl":
+        w_max = safe_float(params.get("w_max")) * 1000 
+        params["w_max"] = w_max
+    elif load_type == "moment":
+        M_applied = safe_float(params.get("M_applied")) * 1000 
+        params["M_applied"] = M_applied
+
+    section = rectangular_section(b, d)
+
+    val = 0.0
+    if load_type == "udl":
+        val = params.get("w", 0)
+    elif load_type in ["point_center", "point_anywhere"]:
+        val = params.get("P", 0)
+    elif load_type == "uvl":
+        val = params.get("w_max", 0)
+    elif load_type == "moment":
+        val = params.get("M_applied", 0)
+
+    limit_state = form.get("limit_state")
+
+    # Inputs
+    length = safe_float(form.get("length"))
+    b = safe_float(form.get("b")) / 1000  # convert mm→m
+    d = safe_float(form.get("d")) / 1000
+    P = safe_float(form.get("P"))
+    w = safe_float(form.get("w"))
+    w_max = safe_float(form.get("w_max"))
+    M_applied = safe_float(form.get("M_applied"))
+
+    # Calculate loads
+    dl, il, wl = calculate_loads(length, b, d, P, w, w_max, M_applied)
+
+    # Factored loads
+    results = factored_loads(limit_state, dl, il, wl)
+    
+    R1, R2, M_max, x_vals, V_vals, M_vals, deflection_vals, max_deflection = calculate_all(
+        length, load_type, params, E=E_modulus, I=section["I"]
+    )
+    # R1, R2, M_max, delta_max, x_vals, V_vals, M_vals, deflection_vals = calculate_all(length, load_type, params)
+
+    # IS 456 reinforcement design replaces the flat 120 kg/m³ steel estimate
+    reinforcement = design_summary(
+        b * 1000, d * 1000, length, M_max, max(abs(v) for v in V_vals), material_key
+    )
+
+    rates = get_rates()
+    cost = {key: value.item() for key, value in beam_costs(
+        b * 1000, d * 1000, length, reinforcement["steel_weight"], rates
+    ).items()}
+    volume_concrete = cost["volume_concrete"]
+    steel_weight = cost["steel_weight"]
+    cost_concrete = cost["cost_concrete"]
+    cost_steel = cost["cost_steel"]
+    binding_wire_weight = cost["binding_wire_weight"]
+    binding_wire_cost = cost["binding_wire_cost"]
+    total_cost = cost["total_cost"]
+    
+    stress, stress_ok = stress_check(M_max * 1e6, section["Z"] * 1e9, material.get("fck", 0))
+    stress = round(stress, 2)
+    stress_warning = ""
+    stress_fix = ""
+    if not stress_ok:
+        stress_warning = f"⚠️ Warning: Stress {stress} MPa exceeds allowable limit of {material.get('fck', 0)} MPa!"
+        stress_fix = suggest_fix_for_stress_warning(stress, material_key)
+    else:
+        stress_fix = "✅ Stress is within acceptable limits."
+
+    stress_ratio = round(stress / material.get("fck", 1), 2)
+
+    # Fiber-section response (cracked concrete + steel) at the service moment
+    fiber = fiber_summary(
+        length, load_type, params, b * 1000, d * 1000,
+        reinforcement["Ast"], reinforcement["fck"], reinforcement["fy"], M_max
+    )
+    stress_profile = fiber["stress_profile"]
+    cracked_section = fiber["cracked_section"]
+
+    deflection = max_deflection
+    deflection_limit = permissible_deflection(length)
+    deflection_ok = deflection <= deflection_limit
+
+    # Every compiled code rule (span/depth, lateral stability, dimensions, ...)
+    code_checks = summarize(check_arrays(
+        length, b * 1000, d * 1000, allowable_stress(material_key), M_max, deflection
+    ))
+
+    deflection_warning = ""
+    deflection_fix = ""
+    if not deflection_ok:
+        deflection_warning = f"⚠️ Warning: Deflection {round(deflection, 2)} mm exceeds limit of {round(deflection_limit, 2)} mm."
+        deflection_fix = suggest_fix_for_deflection_warning(deflection, deflection_limit)
+    else:
+        deflection_fix = "✅ Deflection is within acceptable limits."
+
+    deflection_ratio = round(deflection / deflection_limit, 2)
+
+    # AI suggestions with timeout protection
+    ai_error_explanation = ""
+    ai_response = ""
+    
+    # Try AI suggestions with timeout (non-blocking)
+    try:
+        if not stress_ok or not deflection_ok:
+            # Use threading to prevent blocking
             import threading
-            ai_suggestion_result = [None]
+            ai_result = [None]
             
-            def get_ai_suggestions():
+            def get_ai_explanation():
                 try:
-                    ai_suggestion_result[0] = langchain_suggestions(building_type, length, load_type, val)
+                    ai_result[0] = langchain_error_explanation(
+                        length=length,
+                        b=b,
+                        d=d,
+                        material=material_key,
+                        stress=stress,
+                        stress_ok=stress_ok,
+                        deflection=deflection,
+                        deflection_ok=deflection_ok,
+                        load_type=load_type
+                    )
                 except:
                     pass
             
-            thread2 = threading.Thread(target=get_ai_suggestions)
-            thread2.daemon = True
-            thread2.start()
-            thread2.join(timeout=5)  # 5 second timeout
-            ai_response = ai_suggestion_result[0] if ai_suggestion_result[0] else ""
-        except Exception as e:
-            print(f"⚠️ AI suggestions failed: {e}")
-            ai_response = ""
-
-        beam_data = {
-            "_id": str(uuid.uuid4()),
-            "timestamp": datetime.datetime.utcnow(),
-            "length": length,
-            "loadType": load_type,
-            "P": safe_float(params.get("P")),
-            "a": safe_float(params.get("a")),
-            "w": safe_float(params.get("w")),
-            "w_max": safe_float(params.get("w_max")),
-            "M_applied": safe_float(params.get("M_applied")),
-            "b": b * 1000,
-            "d": d * 1000,
-            "material": material_key,
-            "results": {
-                "R1": R1,
-                "R2": R2,
-                "M_max": M_max,
-                "max_deflection": max_deflection,
-                "stress": stress,
-                "stress_ok": stress_ok,
-                "deflection_ok": deflection_ok,
-                "stress_ratio": stress_ratio,
-                "deflection_ratio": deflection_ratio
-            },
-            "cost": {
-                "volume_concrete": volume_concrete,
-                "steel_weight": steel_weight,
-                "cost_concrete": cost_concrete,
-                "cost_steel": cost_steel,
-                "binding_wire_cost": binding_wire_cost,
-                "total_cost": total_cost
-            }
-        }
-
-        # 💾 Save beam_data to MongoDB (only if MongoDB is configured)
-        if mongo:
+            thread = threading.Thread(target=get_ai_explanation)
+            thread.daemon = True
+            thread.start()
+            thread.join(timeout=5)  # 5 second timeout
+            ai_error_explanation = ai_result[0] if ai_result[0] else ""
+    except Exception as e:
+        print(f"⚠️ AI error explanation failed: {e}")
+        ai_error_explanation = ""
+    
+    # AI general suggestions with timeout
+    try:
+        import threading
+        ai_suggestion_result = [None]
+        
+        def get_ai_suggestions():
             try:
-                mongo.db.projects.insert_one(beam_data)
-            except Exception as e:
-                print(f"⚠️ MongoDB save failed (non-critical): {e}")
-                # Continue without saving - calculation results still work
-
-        return render_template('index.html',
-                               R1=round(R1, 2),
-                               R2=round(R2, 2),
-                               M_max=M_max,
-                               x_vals=x_vals,
-                               V_vals=V_vals,
-                               M_vals=M_vals,
-                               deflection_vals=deflection_vals,
-                               stress=stress,
-                               stress_ok="✅ OK" if stress_ok else "❌ Exceeds Limit",
-                               stress_warning=stress_warning,
-                               stress_fix=stress_fix,
-                               deflection=round(deflection, 2),
-                               deflection_ok="✅ OK" if deflection_ok else "❌ Exceeds Limit",
-                               deflection_warning=deflection_warning,
-                               deflection_fix=deflection_fix,
-                               results=results,
-                               dl=dl,
-                               il=il,
-                               wl=wl,
-                               building_type=building_type,
-                               stress_profile=stress_profile,
-                               ai_response=ai_response,
-                               volume_concrete=round(volume_concrete, 3),
-                               steel_weight=round(steel_weight, 1),
-                               cost_concrete=int(cost_concrete),
-                               cost_steel=int(cost_steel),
-                               total_cost=int(total_cost),
-                               binding_wire_weight=round(binding_wire_weight, 2),
-                               binding_wire_rate=72,
-                               binding_wire_cost=int(binding_wire_cost),
-                               ai_error_explanation=ai_error_explanation,
-                               beam_data=beam_data,
-                               stress_ratio=stress_ratio,
-                               deflection_ratio=deflection_ratio
-                               )
+                ai_suggestion_result[0] = langchain_suggestions(building_type, length, load_type, val)
+            except:
+                pass
+        
+        thread2 = threading.Thread(target=get_ai_suggestions)
+        thread2.daemon = True
+        thread2.start()
+        thread2.join(timeout=5)  # 5 second timeout
+        ai_response = ai_suggestion_result[0] if ai_suggestion_result[0] else ""
+    except Exception as e:
+        print(f"⚠️ AI suggestions failed: {e}")
+        ai_response = ""
 
+    beam_data = {
+        "length": length,
+        "loadType": load_type,
+        "P": safe_float(params.get("P")),
+        "a": safe_float(params.get("a")),
+        "w": safe_float(params.get("w")),
+        "w_max": safe_float(params.get("w_max")),
+        "M_applied": safe_float(params.get("M_applied")),
+        "b": b * 1000,
+        "d": d * 1000,
+        "material": material_key,
+        "results": {
+            "R1": R1,
+            "R2": R2,
+            "M_max": M_max,
+            "max_deflection": max_deflection,
+            "stress": stress,
+            "stress_ok": stress_ok,
+            "deflection_ok": deflection_ok,
+            "stress_ratio": stress_ratio,
+            "deflection_ratio": deflection_ratio
+        },
+        "reinforcement": {
+            "Ast": reinforcement["Ast"],
+            "Mu_lim": reinforcement["Mu_lim"],
+            "stirrup_spacing": reinforcement["stirrup_spacing"],
+            "Ast_ok": reinforcement["Ast_ok"],
+            "shear_ok": reinforcement["shear_ok"]
+        },
+        "cracked_section": cracked_section,
+        "code_checks": code_checks,
+        "cost": {
+            "volume_concrete": volume_concrete,
+            "steel_weight": steel_weight,
+            "cost_concrete": cost_concrete,
+            "cost_steel": cost_steel,
+            "binding_wire_cost": binding_wire_cost,
+            "total_cost": total_cost
+        },
+        "rates": rates
+    }
+
+    return dict(R1=round(R1, 2),
+                R2=round(R2, 2),
+                M_max=M_max,
+                x_vals=x_vals,
+                V_vals=V_vals,
+                M_vals=M_vals,
+                deflection_vals=deflection_vals,
+                stress=stress,
+                stress_ok="✅ OK" if stress_ok else "❌ Exceeds Limit",
+                stress_warning=stress_warning,
+                stress_fix=stress_fix,
+                deflection=round(deflection, 2),
+                deflection_ok="✅ OK" if deflection_ok else "❌ Exceeds Limit",
+                deflection_warning=deflection_warning,
+                deflection_fix=deflection_fix,
+                results=results,
+                dl=dl,
+                il=il,
+                wl=wl,
+                building_type=building_type,
+                stress_profile=stress_profile,
+                ai_response=ai_response,
+                volume_concrete=round(volume_concrete, 3),
+                steel_weight=round(steel_weight, 1),
+                cost_concrete=int(cost_concrete),
+                cost_steel=int(cost_steel),
+                total_cost=int(total_cost),
+                binding_wire_weight=round(binding_wire_weight, 2),
+                binding_wire_rate=rates["binding_wire"],
+                concrete_rate=rates["concrete"],
+                steel_rate=rates["steel"],
+                binding_wire_cost=int(binding_wire_cost),
+                reinforcement=reinforcement,
+                cracked_section=cracked_section,
+                code_checks=code_checks,
+                ai_error_explanation=ai_error_explanation,
+                beam_data=beam_data,
+                stress_ratio=stress_ratio,
+                deflection_ratio=deflection_ratio
+                )
+
+@app.route("/stats/calculate", methods=["GET"])
+def calculate_stats():
+    """Counters for work saved by /calculate request coalescing."""
+    return jsonify(calculation_flight.stats())
+
+@app.route("/calculate_diff", methods=["POST"])
+def calculate_diff():
+    """Incremental what-if recompute.
+
+    Body: {"state_id": <id from a previous response, optional>, "changes": {...form fields...}}
+    Only the pipeline stages downstream of the changed fields are recomputed.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        state = run_pipeline(data.get("changes", {}), data.get("state_id"))
+        return jsonify(state)
+    except KeyError:
+        return jsonify({"error": "Unknown or expired state_id"}), 404
     except Exception as e:
-        print("❌ ERROR:", e)
+        print("❌ Incremental calculation error:", e)
         traceback.print_exc()
-        return render_template('index.html', error=f"Calculation Error: {e}")
+        return jsonify({"error": f"Calculation Error: {e}"}), 400
+
+@app.route("/live/<client_id>/update", methods=["POST"])
+def live_update(client_id):
+    """Recompute live charts for the posted slider state and return the changed series.
+
+    Body: {"inputs": {form fields...}, "state_id": from the last response,
+           "digests": from the last response}.
+    """
+    data = request.get_json(silent=True) or {}
+    # Rate limited per signed-in user or address; the URL id only separates their tabs
+    owner = session.get("user_id") or request.remote_addr
+    try:
+        result = compute_update(owner, client_id, data.get("inputs") or {}, data.get("state_id"), data.get("digests"))
+    except Exception as e:
+        print(f"⚠️ Live update failed: {e}")
+        return jsonify({"error": str(e)}), 400
+    if result is None:
+        return jsonify({"error": "Too many updates"}), 429
+    return jsonify(result)
+
+@app.route("/stats/token_cache", methods=["GET"])
+def token_cache_stats():
+    """Hit rate and key state of the verified-token cache."""
+    if not token_verifier:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **token_verifier.stats()})
+
+@app.route("/live/stats", methods=["GET"])
+def live_status():
+    return jsonify(live_stats())
+
+def _modal_request(data):
+    beams = data.get("beams", [])
+    if not beams:
+        raise ValueError("No beams provided")
+    props = beam_properties(
+        [safe_float(beam.get("length")) for beam in beams],
+        [safe_float(beam.get("b")) for beam in beams],
+        [safe_float(beam.get("d")) for beam in beams],
+        [beam.get("material", "M20") for beam in beams],
+    )
+    return modal_analysis(
+        props["L"], props["E"], props["I"], props["m"],
+        n_modes=int(data.get("n_modes", 3)),
+        support=data.get("support", "simple"),
+    )
+
+@app.route("/modal_analysis", methods=["POST"])
+def modal_analysis_route():
+    """Natural frequencies and mode shapes for a batch of beams.
+
+    Body: {"beams": [{"length": m, "b": mm, "d": mm, "material": "M20"}, ...],
+           "n_modes": 3, "support": "simple" | "cantilever" | "fixed" | "propped"}
+    """
+    try:
+        modes = _modal_request(request.get_json(silent=True) or {})
+        return jsonify({
+            "frequencies": modes["frequencies"].tolist(),
+            "xi": modes["xi"].tolist(),
+            "shapes": modes["shapes"].tolist(),
+        })
+    except Exception as e:
+        print(f"⚠️ Modal analysis failed: {e}")
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/modal_response", methods=["POST"])
+def modal_response_route():
+    """Streamed time-history response (newline-delimited JSON, one line per chunk).
+
+    Body as /modal_analysis plus "load": {"type": "harmonic", "amplitude": N, "frequency": Hz}
+    or {"type": "footfall", "pace_frequency": Hz}, "duration" (≤ 600 s), "dt" (≥ 1e-4 s,
+    at most 200000 steps) and "damping" (0 ≤ ζ < 1). Invalid values are a 400 before streaming starts.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        modes = _modal_request(data)
+        load_spec = data.get("load", {})
+        if load_spec.get("type", "footfall") == "harmonic":
+            load = harmonic_load(safe_float(load_spec.get("amplitude"), 1000), safe_float(load_spec.get("frequency"), 2.0))
+        else:
+            load = footfall_load(safe_float(load_spec.get("pace_frequency"), 2.0))
+        chunks = stream_time_history(
+            modes, load,
+            duration=min(safe_float(data.get("duration"), 10.0), 600.0),
+            dt=safe_float(data.get("dt"), 0.005),
+            load_position=safe_float(data.get("load_position"), 0.5),
+            output_position=safe_float(data.get("output_position"), 0.5),
+            damping=safe_float(data.get("damping"), 0.02),
+        )
+    except Exception as e:
+        print(f"⚠️ Modal response failed: {e}")
+        return jsonify({"error": str(e)}), 400
+
+    def generate():
+        for chunk in chunks:
+            yield json.dumps({key: value.tolist() for key, value in chunk.items()}) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+@app.route("/profile_export", methods=["POST"])
+def profile_export():
+    """Full-resolution profile written to a memory-mapped .npy file.
+
+    Body: the /calculate form fields plus "n_stations" (up to 5e6),
+    "dtype" ("float32" or "float64") and "max_points" for the decimated view.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        inputs = {**INPUT_DEFAULTS, **normalize_inputs(data)}
+        material = get_material_properties(inputs["material"])
+        section = rectangular_section(inputs["b"] / 1000, inputs["d"] / 1000)
+        profile_args = (
+            inputs["length"], inputs["loadType"], load_params(inputs),
+            material.get("E", 25e9), section["I"],
+            int(safe_float(data.get("n_stations"), 100000)),
+            data.get("dtype", "float64"),
+        )
+        max_points = int(safe_float(data.get("max_points"), 1000))
+        key, summary, created = get_or_create_profile(*profile_args)
+        try:
+            view = decimated_view(key, max_points)
+        except FileNotFoundError:
+            # Evicted by another request in between: write it once more
+            key, summary, created = get_or_create_profile(*profile_args)
+            view = decimated_view(key, max_points)
+        return jsonify({
+            "key": key,
+            "created": created,
+            "summary": summary,
+            "download": f"/profile_export/{key}.npy",
+            **view,
+        })
+    except Exception as e:
+        print(f"⚠️ Profile export failed: {e}")
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/profile_export/<key>.npy", methods=["GET"])
+def profile_download(key):
+    try:
+        path = profile_path(key)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not os.path.exists(path):
+        return jsonify({"error": "Profile not found"}), 404
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True)
+
+@app.route("/project_cost", methods=["POST"])
+def project_cost():
+    """Bill of quantities for every beam of a project.
+
+    Body: {"beams": [{/calculate fields..., "floor": ...}, ...],
+           "group_by": ["material", "floor", "load_type"]}
+    """
+    data = request.get_json(silent=True) or {}
+    beams = data.get("beams", [])
+    if not beams:
+        return jsonify({"error": "No beams provided"}), 400
+    try:
+        costs = project_costs(beams)
+        return jsonify(bill_of_quantities(beams, costs, data.get("group_by", ("material", "floor", "load_type"))))
+    except Exception as e:
+        print(f"⚠️ Project cost failed: {e}")
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/design_lookup", methods=["GET", "POST"])
+def design_lookup():
+    """Early-stage sizing from the precomputed design tables.
+
+    Fields (query string or JSON): length (m), load (kN, kN/m or kN·m),
+    material, loadType, optional b (mm, default 230) and d (mm) to also get
+    the stress and deflection ratios of that section.
+    """
+    data = request.get_json(silent=True) or request.args
+    missing = [key for key in ("length", "load") if data.get(key) in (None, "")]
+    if missing:
+        return jsonify({"error": f"Missing required fields: {', '.join(missing)}"}), 400
+    try:
+        depth = data.get("d")
+        result = table_lookup(
+            float(data.get("length")), float(data.get("load")),
+            data.get("material", "M20"), data.get("loadType", "udl"),
+            float(data.get("b") or 230), float(depth) if depth not in (None, "") else None,
+        )
+        return jsonify(result)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+def _finite_or_none(values):
+    # Utilization is infinite for missing or zero dimensions, which JSON cannot carry
+    return [float(v) if np.isfinite(v) else None for v in values]
+
+@app.route("/check_beams", methods=["POST"])
+def check_beams_route():
+    """Code-compliance checks for a batch of beams.
+
+    Body: {"beams": [{/calculate fields..., "support": "simple", "element": "beam"}, ...],
+           "details": false}. Per beam: failure bitmask (bit i = rules[i]),
+    ok, governing rule and its utilization; "details" adds every rule's utilization.
+    """
+    data = request.get_json(silent=True) or {}
+    beams = data.get("beams", [])
+    if not beams:
+        return jsonify({"error": "No beams provided"}), 400
+    try:
+        result = check_beams(beams)
+    except Exception as e:
+        print(f"⚠️ Beam checks failed: {e}")
+        return jsonify({"error": str(e)}), 400
+    names = rule_names()
+    failures = ((result["mask"][:, None] >> np.arange(len(names), dtype=np.uint64)) & 1).sum(axis=0)
+    response = {
+        "rules": names,
+        "summary": {
+            "checked": len(beams),
+            "passed": int(result["ok"].sum()),
+            "failures": {name: int(count) for name, count in zip(names, failures)},
+        },
+        "mask": result["mask"].tolist(),
+        "ok": result["ok"].tolist(),
+        "governing": [names[i] for i in result["governing"]],
+        "governing_utilization": _finite_or_none(result["governing_utilization"]),
+    }
+    if data.get("details"):
+        response["utilization"] = {name: _finite_or_none(result["utilization"][i]) for i, name in enumerate(names)}
+    return jsonify(response)
 
 @app.route("/verify_token", methods=["POST"])
 def verify_token():
@@ -339,8 +658,10 @@ def verify_token():
             return jsonify({"error": "No token provided"}), 400
         
         if firebase_initialized:
-            # Verify the token using Firebase Admin SDK
-            decoded_token = auth.verify_id_token(id_token)
+            if token_verifier:
+                decoded_token = token_verifier.verify(id_token)
+            else:
+                decoded_token = auth.verify_id_token(id_token)
             session["user_id"] = decoded_token["uid"]
             session["user_email"] = decoded_token.get("email", "")
             return jsonify({"success": True, "uid": decoded_token["uid"]})
@@ -362,30 +683,81 @@ def chat():
         if not user_query:
             return jsonify({"response": "Please enter a valid question."})
         
-        # Temporarily disable AI chatbot on free tier to prevent timeouts
-        # Return a simple response instead
-        return jsonify({
-            "response": "AI chatbot is temporarily disabled on the free tier to ensure reliable calculations. Please upgrade to a paid plan for AI features, or use the calculation results which work perfectly!"
-        })
-        
-        # Uncomment below to enable AI chatbot (requires paid Render plan):
-        # response = structural_chatbot_response(user_query)
-        # return jsonify({"response": response})
+        # Code-clause questions are answered from the local index in milliseconds;
+        # only unmatched questions go to the LLM
+        return jsonify(chatbot_answer(user_query))
     except Exception as e:
         print("Chatbot Error:", e)
         return jsonify({"response": "Sorry, the assistant is currently unavailable."})
 
+@app.route("/chat/stream", methods=["POST"])
+def chat_stream():
+    """Server-sent events with the answer as it is generated (meta, token..., done)."""
+    data = request.get_json(silent=True) or {}
+    user_query = data.get("message", "").strip()
+    if not user_query:
+        return jsonify({"response": "Please enter a valid question."}), 400
+
+    def events():
+        # Flask closes this generator when the browser disconnects, which
+        # closes the upstream LLM stream as well
+        for event in stream_chatbot_answer(user_query):
+            yield f"data: {json.dumps(event)}\n\n"
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # 🧾 Optional API: Get all saved projects
 @app.route("/get_projects", methods=["GET"])
 def get_projects():
     if not mongo:
         return jsonify({"error": "MongoDB not configured"}), 503
     try:
-        projects = list(mongo.db.projects.find({}, {"_id": 0}))
+        projects = list(mongo.db.projects.aggregate(
+            project_view_stages() + [{"$addFields": {"project_id": "$_id"}}, {"$project": {"_id": 0}}]
+        ))
         return jsonify(projects)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/load_project/<project_id>", methods=["GET"])
+def load_project_route(project_id):
+    """A saved project with its stored results, without recomputing."""
+    if not mongo:
+        return jsonify({"error": "MongoDB not configured"}), 503
+    try:
+        project = load_project(mongo.db, project_id)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    if project is None:
+        return jsonify({"error": "Project not found"}), 404
+    project["project_id"] = project.pop("_id")
+    return jsonify(project)
+
+# 📊 Dashboards over saved projects
+@app.route("/dashboard/summary", methods=["GET"])
+def dashboard_summary():
+    """Pre-aggregated dashboard read from the incrementally maintained summaries."""
+    if not mongo:
+        return jsonify({"error": "MongoDB not configured"}), 503
+    try:
+        return jsonify(read_summaries(mongo.db))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/dashboard/aggregate", methods=["GET"])
+def dashboard_aggregate():
+    """Same dashboard computed by server-side aggregation over all projects."""
+    if not mongo:
+        return jsonify({"error": "MongoDB not configured"}), 503
+    try:
+        return jsonify(aggregate_dashboard(mongo.db))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 5000))
     debug = os.getenv("FLASK_DEBUG", "False").lower() == "true"
@@ -99,11 +99,12 @@ def moment_applied(L, M_applied, E=25e9, I=8.33e-6):
     return R1, R2, M_max, x.tolist(), V.tolist(), M.tolist(), delta_vals, max_delta
 
 # 2. Material Properties
+# density in kg/m³
 materials = {
-    "M20": {"fck": 20, "E": 25e9},
-    "M25": {"fck": 25, "E": 30e9},
-    "Fe415": {"fy": 415, "E": 2e11},
-    "Fe500": {"fy": 500, "E": 2e11}
+    "M20": {"fck": 20, "E": 25e9, "density": 2500},
+    "M25": {"fck": 25, "E": 30e9, "density": 2500},
+    "Fe415": {"fy": 415, "E": 2e11, "density": 7850},
+    "Fe500": {"fy": 500, "E": 2e11, "density": 7850}
 }
 
 def get_material_properties(name):
@@ -182,3 +183,125 @@ def stress_distribution(fck, d):
     depths = np.linspace(0, d, 10).tolist()
     stresses = [fck * (1 - x / d) for x in depths]
     return {"depths": depths, "stresses": stresses}
+
+# 7. Profiles at arbitrary stations
+def profile_at(x, L, load_type, params, E=25e9, I=8.33e-6):
+    """Shear (kN), moment (kN·m) and deflection (mm) at stations ``x`` (m).
+
+    Vectorized counterpart of the load-case functions above for any number
+    of stations; returns three float64 arrays shaped like ``x``.
+    """
+    x = np.asarray(x, dtype=float)
+    if load_type == "point_center":
+        P = float(params.get("P", 0))
+        R1 = R2 = P / 2
+        left = x < L / 2
+        V = np.where(left, R1, -R2)
+        M = np.where(left, R1 * x, R1 * x - P * (x - L / 2))
+        xs = np.where(x <= L / 2, x, L - x)
+        delta = (P * xs) / (48 * E * I) * (3 * L ** 2 - 4 * xs ** 2)
+    elif load_type == "point_anywhere":
+        P = float(params.get("P", 0))
+        a = float(params.get("a", 0))
+        b = L - a
+        R1 = (P * b) / L
+        R2 = (P * a) / L
+        left = x < a
+        V = np.where(left, R1, R1 - P)
+        M = np.where(left, R1 * x, R2 * (L - x))
+        delta = np.where(
+            x <= a,
+            (P * b * x) * (L ** 2 - b ** 2 - x ** 2) / (6 * L * E * I),
+            (P * a * (L - x)) * (2 * L * x - x ** 2 - a ** 2) / (6 * L * E * I),
+        )
+    elif load_type == "udl":
+        w = float(params.get("w", 0))
+        R1 = w * L / 2
+        V = R1 - w * x
+        M = R1 * x - (w * x ** 2) / 2
+        delta = (w * x * (L ** 3 - 2 * L * x ** 2 + x ** 3)) / (24 * E * I)
+    elif load_type == "uvl":
+        w_max = float(params.get("w_max", 0))
+        R1 = (w_max * L) / 2 - (w_max * L) / 3
+        V = R1 - (w_max / L) * (x ** 2) / 2
+        M = R1 * x - (w_max * x ** 3) / (6 * L)
+        delta = x_deflection_profile_uvl(w_max, L, x, E, I) / 1000
+    elif load_type == "moment":
+        R1 = -float(params.get("M_applied", 0)) / L
+        V = np.full_like(x, R1)
+        M = R1 * x
+        delta = np.zeros_like(x)
+    else:
+        raise ValueError("Invalid load type")
+    return V / 1000, M / 1000, delta * 1000
+
+# 8. Maximum service actions for batches of beams
+def load_position(a, L):
+    """point_anywhere load positions (m) clipped to the span; missing (None/NaN) means midspan."""
+    L = np.asarray(L, dtype=float)
+    if a is None:
+        return L / 2
+    a = np.asarray(a, dtype=float)
+    return np.clip(np.where(np.isnan(a), L / 2, a), 0, L)
+
+
+def service_actions(load_type, length, P, w, w_max, M_applied, a=None):
+    """Maximum service moment (kN·m) and shear (kN) for arrays of simply supported beams.
+
+    Loads in kN, kN/m and kN·m as entered on the form; ``a`` (m) is the
+    point_anywhere load position, midspan when not given (None, or NaN for
+    one beam of the batch).
+    """
+    load_type = np.asarray(load_type, dtype=str)
+    L = np.asarray(length, dtype=float)
+    a = load_position(a, L)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cases = [
+            (load_type == "point_center", P * L / 4, P / 2),
+            (load_type == "point_anywhere", P * a * (L - a) / L, P * np.maximum(a, L - a) / L),
+            (load_type == "udl", w * L ** 2 / 8, w * L / 2),
+            (load_type == "uvl", w_max * L ** 2 / (9 * math.sqrt(3)), w_max * L / 3),
+            (load_type == "moment", np.abs(M_applied), np.abs(M_applied) / L),
+        ]
+        M = np.select([c for c, _, _ in cases], [m for _, m, _ in cases], 0.0)
+        V = np.select([c for c, _, _ in cases], [v for _, _, v in cases], 0.0)
+    return M, np.nan_to_num(V)
+
+
+def beam_actions(load_type, support, length, P, a, w, w_max, M_applied, E, I):
+    """Maximum service moment (kN·m) and deflection (mm) for arrays of beams.
+
+    Loads in kN, kN/m and kN·m, ``a`` in m, ``E`` in Pa and ``I`` in m⁴.
+    Cantilevers are fixed at x = 0: point_center acts at mid-length,
+    point_anywhere at ``a`` (a = L for a tip load, midspan when missing), the uvl peaks at the
+    free end and the applied moment acts at the tip. Other supports use the
+    simply supported values, an upper bound on both moment and deflection
+    for continuous, fixed and propped spans under gravity loads.
+    """
+    L = length
+    a = load_position(a, L)
+    cantilever = support == "cantilever"
+    with np.errstate(divide="ignore", invalid="ignore"):
+        EI = E * I / 1000  # kN·m², so loads in kN give deflections in m
+        M_simple, _ = service_actions(load_type, L, P, w, w_max, M_applied, a)
+        b = np.minimum(a, L - a)
+        simple = [
+            ("point_center", P * L ** 3 / (48 * EI)),
+            ("point_anywhere", P * b * (L ** 2 - b ** 2) ** 1.5 / (9 * math.sqrt(3) * L * EI)),
+            ("udl", 5 * w * L ** 4 / (384 * EI)),
+            ("uvl", 0.00652 * w_max * L ** 4 / EI),
+            ("moment", np.abs(M_applied) * L ** 2 / (9 * math.sqrt(3) * EI)),
+        ]
+        tip = [
+            ("point_center", P * L / 2, 5 * P * L ** 3 / (48 * EI)),
+            ("point_anywhere", P * a, P * a ** 2 * (3 * L - a) / (6 * EI)),
+            ("udl", w * L ** 2 / 2, w * L ** 4 / (8 * EI)),
+            ("uvl", w_max * L ** 2 / 3, 11 * w_max * L ** 4 / (120 * EI)),
+            ("moment", np.abs(M_applied), np.abs(M_applied) * L ** 2 / (2 * EI)),
+        ]
+        deflection = np.select([load_type == name for name, _ in simple], [value for _, value in simple], 0.0)
+        M_tip = np.select([load_type == name for name, _, _ in tip], [m for _, m, _ in tip], 0.0)
+        deflection_tip = np.select([load_type == name for name, _, _ in tip], [v for _, _, v in tip], 0.0)
+    M = np.where(cantilever, M_tip, M_simple)
+    deflection = np.where(cantilever, deflection_tip, deflection) * 1000
+    return M, deflection
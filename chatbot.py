@@ -1,33 +1,64 @@
 import os
+import threading
 from groq import Groq
 
+from clause_index import answer_from_clauses
+
 GROQ_API_KEY = os.getenv("GROQ_API_KEY") or "your-groq-api-key"
+# Point at a local fake (loadtest/fake_groq_server.py) or a proxy
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+GROQ_MODEL = "llama-3.3-70b-versatile"
 
-# Only initialize if API key is valid
-client = None
-if GROQ_API_KEY and GROQ_API_KEY != "your-groq-api-key":
-    try:
-        client = Groq(api_key=GROQ_API_KEY)
-    except:
-        client = None
+# One client per worker process, created on first use so its HTTP
+# connection pool is never shared across a fork
+_client = None
+_client_lock = threading.Lock()
 
-def structural_chatbot_response(user_query):
-    if not client:
-        return "AI chatbot is temporarily disabled. Calculation features work perfectly!"
-    
-    try:
-        prompt = f"""
+def get_client():
+    global _client
+    if _client is None and GROQ_API_KEY and GROQ_API_KEY != "your-groq-api-key":
+        with _client_lock:
+            if _client is None:
+                try:
+                    _client = Groq(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL)
+                except Exception as e:
+                    print(f"⚠️ Could not create Groq client: {e}")
+    return _client
+
+def _messages(user_query):
+    prompt = f"""
 You are a helpful structural engineering assistant.
 User asked: "{user_query}"
 
 Answer clearly with explanations related to structural load analysis, beam behavior, material advice, or design checks.
 """
+    return [
+        {"role": "system", "content": "You are a structural engineering assistant."},
+        {"role": "user", "content": prompt}
+    ]
+
+def chatbot_answer(user_query):
+    """Answer from the local clause index when possible, otherwise from the LLM.
+
+    Returns ``{"response", "source", "citations"}`` where source is "clauses" or "llm".
+    """
+    local = answer_from_clauses(user_query)
+    if local:
+        return {"response": local["response"], "source": "clauses", "citations": local["citations"]}
+    return {"response": llm_chatbot_response(user_query), "source": "llm", "citations": []}
+
+def structural_chatbot_response(user_query):
+    return chatbot_answer(user_query)["response"]
+
+def llm_chatbot_response(user_query):
+    client = get_client()
+    if not client:
+        return "AI chatbot is temporarily disabled. Calculation features work perfectly!"
+
+    try:
         response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are a structural engineering assistant."},
-                {"role": "user", "content": prompt}
-            ],
+            model=GROQ_MODEL,
+            messages=_messages(user_query),
             temperature=0.6,
             max_tokens=1000,
             timeout=10  # 10 second timeout
@@ -36,3 +67,50 @@ Answer clearly with explanations related to structural load analysis, beam behav
     except Exception as e:
         print(f"Chatbot error: {e}")
         return "AI chatbot is temporarily unavailable. Calculation features work perfectly!"
+
+def stream_chatbot_answer(user_query):
+    """Yield the answer as events: one "meta" (source, citations), "token" pieces, then "done".
+
+    Closing the generator (the browser went away) closes the upstream LLM
+    stream, which cancels generation instead of letting it run to max_tokens.
+    """
+    local = answer_from_clauses(user_query)
+    if local:
+        yield {"type": "meta", "source": "clauses", "citations": local["citations"]}
+        yield {"type": "token", "text": local["response"]}
+        yield {"type": "done"}
+        return
+
+    yield {"type": "meta", "source": "llm", "citations": []}
+    yield from stream_llm_tokens(user_query)
+    yield {"type": "done"}
+
+def stream_llm_tokens(user_query):
+    client = get_client()
+    if not client:
+        yield {"type": "token", "text": "AI chatbot is temporarily disabled. Calculation features work perfectly!"}
+        return
+
+    stream = None
+    try:
+        # timeout bounds each wait for the next chunk, not the whole answer
+        stream = client.chat.completions.create(
+            model=GROQ_MODEL,
+            messages=_messages(user_query),
+            temperature=0.6,
+            max_tokens=1000,
+            stream=True,
+            timeout=10
+        )
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                yield {"type": "token", "text": text}
+    except Exception as e:
+        print(f"Chatbot stream error: {e}")
+        yield {"type": "error", "text": "AI chatbot is temporarily unavailable. Calculation features work perfectly!"}
+    finally:
+        if stream is not None:
+            stream.close()
@@ -0,0 +1,158 @@
+import json
+import os
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+
+# Local retrieval over design-code clauses
+#
+# A small corpus of IS 456 / IS 875 clause summaries and FAQ answers
+# (data/code_clauses.json) is tokenized once, at first use, into an inverted
+# index: term -> (document ids, term frequencies). Queries are scored with
+# BM25 over the postings of their terms only, so common questions are
+# answered in well under a millisecond with a clause citation and the LLM is
+# only needed when nothing in the corpus matches. A match is accepted on its
+# score relative to the best score the query could reach (every term present,
+# terms missing from the corpus counted at the highest idf), so the cutoff
+# means the same for one-word and ten-word questions.
+
+CORPUS_FILE = os.getenv("CODE_CLAUSES_FILE", os.path.join(os.path.dirname(__file__), "data", "code_clauses.json"))
+BM25_K1 = 1.5
+BM25_B = 0.75
+MIN_RELATIVE_SCORE = float(os.getenv("CLAUSE_MIN_RELATIVE_SCORE", "0.35"))
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "how", "i", "in",
+    "is", "it", "its", "me", "my", "of", "on", "or", "should", "the", "to", "what", "when", "which", "why",
+    "with", "per", "we", "you", "your", "this", "that", "there", "any", "much", "many", "use", "used",
+    "tell", "about", "please", "give", "need", "will", "would", "get", "so", "if", "choose", "between",
+    "difference", "explain", "mean", "means", "s",
+}
+# Abbreviations users type that the corpus spells out
+ALIASES = {
+    "udl": "uniformly distributed load",
+    "uvl": "uniformly varying load",
+    "sfd": "shear force diagram",
+    "bmd": "bending moment diagram",
+    "ss": "simply supported",
+    "ll": "imposed load",
+    "live": "imposed",
+    "dl": "dead load",
+    "rcc": "reinforced concrete",
+    "stirrup": "stirrups shear reinforcement",
+    "rebar": "reinforcement",
+}
+TOKEN_PATTERN = re.compile(r"[a-z]+\d*|\d+(?:\.\d+)*")
+
+
+def _stem(token):
+    """Light plural/-ing stripping that maps singular and plural to the same stem."""
+    if token.endswith("ss"):
+        return token
+    if token.endswith("ing") and len(token) >= 6:
+        return token[:-3]
+    if token.endswith("ies") and len(token) >= 5:
+        return token[:-3] + "y"
+    # "es" is a plural ending only after a sibilant (stresses, boxes, inches, meshes)
+    if token.endswith(("sses", "xes", "ches", "shes")) and len(token) >= 5:
+        return token[:-2]
+    if token.endswith("s") and len(token) >= 4 and not token.endswith(("us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        for part in ALIASES.get(token, token).split():
+            if part not in STOPWORDS:
+                tokens.append(_stem(part))
+    return tokens
+
+
+class ClauseIndex:
+    def __init__(self, docs):
+        self.docs = docs
+        postings = {}
+        lengths = []
+        for i, doc in enumerate(docs):
+            # Titles carry the topic, so they count twice
+            tokens = tokenize(f"{doc['title']} {doc['title']} {doc['citation']} {doc['text']}")
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(i)
+                postings[term][1].append(tf)
+        self.lengths = np.asarray(lengths, dtype=float)
+        self.avg_length = self.lengths.mean() if len(docs) else 0.0
+        n = len(docs)
+        self.unknown_idf = np.log(1 + (n + 0.5) / 0.5)
+        self.postings = {}
+        for term, (ids, tfs) in postings.items():
+            df = len(ids)
+            idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+            self.postings[term] = (np.asarray(ids), np.asarray(tfs, dtype=float), idf)
+
+    def max_score(self, terms):
+        """Upper bound of the BM25 score of ``terms`` (term frequency → ∞ in every term)."""
+        return sum(self.postings[t][2] if t in self.postings else self.unknown_idf for t in terms) * (BM25_K1 + 1)
+
+    def search(self, query, k=3):
+        """Top ``k`` documents for ``query`` as (score, relative score, doc), best first.
+
+        The relative score is the BM25 score divided by ``max_score`` of the query.
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.docs:
+            return []
+        scores = np.zeros(len(self.docs))
+        hits = np.zeros(len(self.docs))
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths / self.avg_length)
+        for term in terms:
+            if term not in self.postings:
+                continue
+            ids, tfs, idf = self.postings[term]
+            scores[ids] += idf * tfs * (BM25_K1 + 1) / (tfs + norm[ids])
+            hits[ids] += 1
+        # Documents matching more of the query rank first, BM25 breaks ties
+        top = np.lexsort((-scores, -hits))[:k]
+        best = self.max_score(terms)
+        return [(float(scores[i]), float(scores[i] / best), self.docs[i]) for i in top if scores[i] > 0]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """The clause index, built from the corpus on first use and shared afterwards."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                try:
+                    with open(CORPUS_FILE, encoding="utf-8") as f:
+                        docs = json.load(f)
+                except Exception as e:
+                    print(f"⚠️ Could not load code clauses from {CORPUS_FILE}: {e}")
+                    docs = []
+                _index = ClauseIndex(docs)
+    return _index
+
+
+def answer_from_clauses(query, min_relative_score=MIN_RELATIVE_SCORE):
+    """Answer ``query`` from the corpus, or None when no clause matches well enough.
+
+    Returns the best clause text plus citations for it and any close runners-up.
+    """
+    results = get_index().search(query)
+    if not results:
+        return None
+    best_score, relative, best = results[0]
+    if relative < min_relative_score:
+        return None
+    related = [doc for score, rel, doc in results[1:] if score >= 0.8 * best_score and rel >= min_relative_score]
+    citations = [{"id": doc["id"], "citation": doc["citation"], "title": doc["title"]} for doc in [best] + related]
+    return {"response": f"{best['text']}\n\n📖 {best['citation']} — {best['title']}", "citations": citations}
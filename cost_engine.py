@@ -0,0 +1,122 @@
+import json
+import math
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from beam_logic import get_material_properties, service_actions
+from reinforcement import GAMMA_F, DEFAULT_FCK, DEFAULT_FY, design_beams, steel_quantities
+
+# Cost / bill-of-quantities engine
+#
+# Rates come from DEFAULT_RATES, optionally overridden by the JSON file named
+# in COST_RATES_FILE, and are cached per process. Costs are computed on arrays
+# over every beam of a project and grouped with np.unique + np.bincount.
+
+DEFAULT_RATES = {
+    "concrete": 6000,        # INR per m³
+    "steel": 65,             # INR per kg
+    "binding_wire": 72,      # INR per kg
+    "binding_wire_ratio": 0.01,  # kg of wire per kg of steel
+    "steel_per_m3": 120,     # kg/m³, used when no steel quantity is known
+}
+QUANTITIES = ("volume_concrete", "steel_weight", "binding_wire_weight",
+              "cost_concrete", "cost_steel", "binding_wire_cost", "total_cost")
+GROUP_KEYS = {"material": "material", "floor": "floor", "load_type": "loadType"}
+
+
+@lru_cache(maxsize=1)
+def get_rates():
+    rates = dict(DEFAULT_RATES)
+    rates_file = os.getenv("COST_RATES_FILE")
+    if rates_file:
+        try:
+            with open(rates_file) as f:
+                rates.update(json.load(f))
+        except Exception as e:
+            print(f"⚠️ Could not load cost rates from {rates_file}: {e}")
+    return rates
+
+
+def reload_rates():
+    get_rates.cache_clear()
+    return get_rates()
+
+
+def beam_costs(b, d, length, steel_weight=None, rates=None):
+    """Quantities and costs for arrays of beams (``b``, ``d`` in mm, ``length`` in m).
+
+    Without ``steel_weight`` (kg) the flat ``steel_per_m3`` ratio is used.
+    """
+    rates = rates or get_rates()
+    b, d, length = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (b, d, length)))
+    volume_concrete = b / 1000 * d / 1000 * length
+    if steel_weight is None:
+        steel_weight = volume_concrete * rates["steel_per_m3"]
+    steel_weight = np.broadcast_to(np.asarray(steel_weight, dtype=float), volume_concrete.shape)
+    binding_wire_weight = steel_weight * rates["binding_wire_ratio"]
+    cost_concrete = volume_concrete * rates["concrete"]
+    cost_steel = steel_weight * rates["steel"]
+    binding_wire_cost = binding_wire_weight * rates["binding_wire"]
+    return {
+        "volume_concrete": volume_concrete,
+        "steel_weight": steel_weight,
+        "binding_wire_weight": binding_wire_weight,
+        "cost_concrete": cost_concrete,
+        "cost_steel": cost_steel,
+        "binding_wire_cost": binding_wire_cost,
+        "total_cost": cost_concrete + cost_steel + binding_wire_cost,
+    }
+
+
+def _column(beams, key, default=0.0):
+    return np.array([beam.get(key, default) for beam in beams])
+
+
+def project_costs(beams, rates=None):
+    """Cost every beam of a project in one pass.
+
+    Each beam is a dict with the /calculate fields (length, loadType, P, a, w,
+    w_max, M_applied, b, d, material) plus optional ``floor``; a point_anywhere
+    beam without ``a`` is loaded at midspan. Steel comes
+    from an IS 456 design of the whole batch.
+    """
+    length = _column(beams, "length").astype(float)
+    b = _column(beams, "b").astype(float)
+    d = _column(beams, "d").astype(float)
+    material = _column(beams, "material", "M20").astype(str)
+    load_type = _column(beams, "loadType", "").astype(str)
+    M, V = service_actions(
+        load_type, length,
+        _column(beams, "P").astype(float), _column(beams, "w").astype(float),
+        _column(beams, "w_max").astype(float), _column(beams, "M_applied").astype(float),
+        _column(beams, "a", math.nan).astype(float),
+    )
+    keys, inverse = np.unique(material, return_inverse=True)
+    props = [get_material_properties(key) for key in keys]
+    fck = np.array([p.get("fck", DEFAULT_FCK) for p in props], dtype=float)[inverse]
+    fy = np.array([p.get("fy", DEFAULT_FY) for p in props], dtype=float)[inverse]
+    design = design_beams(b, d, GAMMA_F * M, GAMMA_F * V, fck, fy)
+    steel = steel_quantities(b, d, length, design["Ast"], design["stirrup_spacing"])
+    return beam_costs(b, d, length, steel["steel_weight"], rates)
+
+
+def _group_totals(labels, costs):
+    groups, inverse = np.unique(labels, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(groups))
+    sums = {q: np.bincount(inverse, weights=costs[q], minlength=len(groups)) for q in QUANTITIES}
+    return [
+        {"group": str(group), "count": int(counts[i]), **{q: float(sums[q][i]) for q in QUANTITIES}}
+        for i, group in enumerate(groups)
+    ]
+
+
+def bill_of_quantities(beams, costs, group_by=("material", "floor", "load_type")):
+    """Project totals plus per-group totals for each grouping in ``group_by``."""
+    boq = {"totals": {q: float(costs[q].sum()) for q in QUANTITIES}}
+    boq["totals"]["count"] = len(beams)
+    for name in group_by:
+        labels = _column(beams, GROUP_KEYS.get(name, name), "").astype(str)
+        boq[f"by_{name}"] = _group_totals(labels, costs)
+    return boq
@@ -0,0 +1,196 @@
+import os
+import sys
+
+from pymongo import UpdateOne
+
+from result_store import project_view_stages
+
+# Project dashboards
+#
+# Two read paths over the `projects` collection:
+#   * materialized summaries in `project_summaries`, updated with $inc on
+#     every insert, so dashboard reads touch one small document per group;
+#   * server-side aggregation pipelines computing the same figures from the
+#     raw documents, used for ad-hoc queries and to rebuild the summaries
+#     (a maintenance command, not an HTTP route).
+#     Projects reference their results in the `results` collection, so the
+#     pipelines start with the result_store $lookup stages.
+
+SUMMARY_COLLECTION = "project_summaries"
+REBUILD_COLLECTION = "project_summaries_rebuild"
+RATIO_FIELDS = ("stress_ratio", "deflection_ratio")
+RATIO_BOUNDARIES = [0, 0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 2.0, 1e9]
+OUT_OF_RANGE = "other"
+
+
+def ratio_bucket(value):
+    """Lower boundary of the histogram bucket holding ``value`` (as $bucket does)."""
+    for low, high in zip(RATIO_BOUNDARIES, RATIO_BOUNDARIES[1:]):
+        if low <= value < high:
+            return low
+    return OUT_OF_RANGE
+
+
+def _is_pass(results):
+    return bool(results.get("stress_ok")) and bool(results.get("deflection_ok"))
+
+
+# 1. Incrementally maintained summaries
+def summary_changes(beam_data):
+    """(filter, update) pairs of $inc upserts that fold one saved project into the summaries."""
+    results = beam_data.get("results", {})
+    material = beam_data.get("material", "")
+    day = beam_data["timestamp"].strftime("%Y-%m-%d")
+    passed = _is_pass(results)
+    changes = [
+        ({"_id": f"material:{material}"},
+         {"$setOnInsert": {"kind": "material", "key": material},
+          "$inc": {"count": 1, "pass": int(passed), "fail": int(not passed),
+                   "stress_fail": int(not results.get("stress_ok")),
+                   "deflection_fail": int(not results.get("deflection_ok"))}}),
+        ({"_id": f"day:{day}"},
+         {"$setOnInsert": {"kind": "day", "key": day},
+          "$inc": {"count": 1, "total_cost": beam_data.get("cost", {}).get("total_cost", 0)}}),
+    ]
+    for field in RATIO_FIELDS:
+        bucket = ratio_bucket(results.get(field, 0))
+        changes.append(({"_id": f"{field}:{bucket}"}, {"$setOnInsert": {"kind": field, "key": bucket}, "$inc": {"count": 1}}))
+    return changes
+
+
+def summary_updates(beam_data):
+    """The summary changes as bulk_write operations."""
+    return [UpdateOne(query, update, upsert=True) for query, update in summary_changes(beam_data)]
+
+
+def record_project(db, beam_data):
+    """Update the summaries for a newly inserted project (one round trip)."""
+    db[SUMMARY_COLLECTION].bulk_write(summary_updates(beam_data), ordered=False)
+
+
+def _shape_summaries(docs):
+    dashboard = {"by_material": [], "cost_per_day": [], "stress_ratio": [], "deflection_ratio": []}
+    for doc in docs:
+        kind = doc.get("kind")
+        if kind == "material":
+            dashboard["by_material"].append({
+                "material": doc["key"], "count": doc["count"], "pass": doc["pass"], "fail": doc["fail"],
+                "stress_fail": doc["stress_fail"], "deflection_fail": doc["deflection_fail"],
+                "pass_rate": doc["pass"] / doc["count"] if doc["count"] else 0.0,
+            })
+        elif kind == "day":
+            dashboard["cost_per_day"].append({"day": doc["key"], "count": doc["count"], "total_cost": doc["total_cost"]})
+        elif kind in RATIO_FIELDS:
+            dashboard[kind].append({"bucket": doc["key"], "count": doc["count"]})
+    dashboard["by_material"].sort(key=lambda row: row["material"])
+    dashboard["cost_per_day"].sort(key=lambda row: row["day"])
+    for field in RATIO_FIELDS:
+        dashboard[field].sort(key=lambda row: (row["bucket"] == OUT_OF_RANGE, row["bucket"]))
+    return dashboard
+
+
+def read_summaries(db):
+    """Dashboard from the materialized summaries; cost is independent of project count."""
+    return _shape_summaries(db[SUMMARY_COLLECTION].find({}))
+
+
+# 2. Aggregation pipelines over raw projects
+def pass_fail_by_material_pipeline():
+    passed = {"$and": [{"$eq": ["$results.stress_ok", True]}, {"$eq": ["$results.deflection_ok", True]}]}
+    return project_view_stages() + [
+        {"$group": {
+            "_id": "$material",
+            "count": {"$sum": 1},
+            "pass": {"$sum": {"$cond": [passed, 1, 0]}},
+            "stress_fail": {"$sum": {"$cond": [{"$eq": ["$results.stress_ok", True]}, 0, 1]}},
+            "deflection_fail": {"$sum": {"$cond": [{"$eq": ["$results.deflection_ok", True]}, 0, 1]}},
+        }},
+        {"$project": {
+            "_id": 0, "material": "$_id", "count": 1, "pass": 1, "stress_fail": 1, "deflection_fail": 1,
+            "fail": {"$subtract": ["$count", "$pass"]},
+            "pass_rate": {"$divide": ["$pass", "$count"]},
+        }},
+        {"$sort": {"material": 1}},
+    ]
+
+
+def cost_per_day_pipeline():
+    return project_view_stages() + [
+        {"$group": {
+            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+            "count": {"$sum": 1},
+            "total_cost": {"$sum": "$cost.total_cost"},
+        }},
+        {"$project": {"_id": 0, "day": "$_id", "count": 1, "total_cost": 1}},
+        {"$sort": {"day": 1}},
+    ]
+
+
+def ratio_histogram_pipeline(field):
+    return project_view_stages() + [
+        {"$bucket": {
+            "groupBy": f"$results.{field}",
+            "boundaries": RATIO_BOUNDARIES,
+            "default": OUT_OF_RANGE,
+            "output": {"count": {"$sum": 1}},
+        }},
+        {"$project": {"_id": 0, "bucket": "$_id", "count": 1}},
+    ]
+
+
+def aggregate_dashboard(db):
+    """Dashboard computed server-side from every project document."""
+    projects = db.projects
+    dashboard = {
+        "by_material": list(projects.aggregate(pass_fail_by_material_pipeline())),
+        "cost_per_day": list(projects.aggregate(cost_per_day_pipeline())),
+    }
+    for field in RATIO_FIELDS:
+        dashboard[field] = list(projects.aggregate(ratio_histogram_pipeline(field)))
+    return dashboard
+
+
+def rebuild_summaries(db):
+    """Recompute the summary documents from scratch with the aggregation pipelines.
+
+    A full scan of `projects`: run it from the command line (python dashboard.py
+    rebuild) during maintenance. Projects saved while it runs may be missed.
+    """
+    dashboard = aggregate_dashboard(db)
+    docs = []
+    for row in dashboard["by_material"]:
+        docs.append({"_id": f"material:{row['material']}", "kind": "material", "key": row["material"],
+                     **{k: row[k] for k in ("count", "pass", "fail", "stress_fail", "deflection_fail")}})
+    for row in dashboard["cost_per_day"]:
+        docs.append({"_id": f"day:{row['day']}", "kind": "day", "key": row["day"],
+                     "count": row["count"], "total_cost": row["total_cost"]})
+    for field in RATIO_FIELDS:
+        for row in dashboard[field]:
+            docs.append({"_id": f"{field}:{row['bucket']}", "kind": field, "key": row["bucket"], "count": row["count"]})
+    # Built aside and swapped in with one rename, so readers never see a
+    # half-empty collection and no $inc lands between a delete and an insert
+    staging = db[REBUILD_COLLECTION]
+    staging.drop()
+    if not docs:
+        db[SUMMARY_COLLECTION].drop()
+        return 0
+    staging.insert_many(docs)
+    staging.rename(SUMMARY_COLLECTION, dropTarget=True)
+    return len(docs)
+
+
+if __name__ == "__main__":
+    # python dashboard.py [summary|aggregate|rebuild]  (uses MONGO_URI)
+    import json
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    db = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/beamdb")).get_default_database()
+    command = sys.argv[1] if len(sys.argv) > 1 else "summary"
+    if command == "rebuild":
+        print(f"✅ Rebuilt {rebuild_summaries(db)} summary documents")
+    elif command == "aggregate":
+        print(json.dumps(aggregate_dashboard(db), indent=2, default=str))
+    else:
+        print(json.dumps(read_summaries(db), indent=2, default=str))
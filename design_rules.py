@@ -0,0 +1,208 @@
+import math
+import re
+
+import numpy as np
+
+from beam_logic import beam_actions, get_material_properties
+
+# Design-code rule engine
+#
+# Each rule is a vectorized predicate over columns of beams: it returns a
+# utilization (demand / capacity) per beam and fails where that exceeds 1.
+# Shared quantities (span, depths, grade strength, moment, deflection) are
+# derived once per batch and every rule is a single numpy expression over
+# them, so a check of tens of thousands of beams stays a handful of array
+# passes however many rules are registered. Results are a uint64 bitmask of
+# failed rules (bit i = RULES[i]) plus the governing rule, the one with the
+# highest utilization, per beam.
+
+MAX_RULES = 64
+EFFECTIVE_COVER = 50  # mm from the tension face to the bar centroid, as in reinforcement.design_beams
+
+# IS 456 cl. 23.2.1: basic span / effective depth ratios (before the
+# tension/compression steel modification factors). "fixed" is treated as
+# continuous and "propped" conservatively as simply supported.
+SPAN_DEPTH_RATIOS = {"simple": 20, "continuous": 26, "fixed": 26, "propped": 20, "cantilever": 7}
+# IS 456 cl. 23.2: span / ratio, capped in mm where the clause gives a cap
+DEFLECTION_LIMITS = {
+    "beam": (250, math.inf),      # final deflection, 23.2(a)
+    "finishes": (350, 20.0),      # after partitions and finishes, 23.2(b)
+}
+# Practical section limits (mm)
+DIMENSION_LIMITS = {"b": (200, 1000), "d": (200, 2000)}
+
+SUPPORTS = tuple(SPAN_DEPTH_RATIOS)
+ELEMENTS = tuple(DEFLECTION_LIMITS)
+
+
+# 1. Rules
+def _lookup(table, labels, column):
+    """Map string labels to ``table[label][column]`` (or ``table[label]``) in one pass."""
+    keys, inverse = np.unique(labels, return_inverse=True)
+    unknown = [str(k) for k in keys if k not in table]
+    if unknown:
+        raise ValueError(f"Unknown value(s) {unknown}; expected one of {list(table)}")
+    values = [table[k] if column is None else table[k][column] for k in keys]
+    return np.asarray(values, dtype=float)[inverse]
+
+
+def _stress(c):
+    z = c["b"] * c["d"] ** 2 / 6
+    return c["M"] * 1e6 / z / c["allowable_stress"]
+
+
+def _deflection(c):
+    ratio = _lookup(DEFLECTION_LIMITS, c["element"], 0)
+    cap = _lookup(DEFLECTION_LIMITS, c["element"], 1)
+    return c["deflection"] / np.minimum(c["length"] * 1000 / ratio, cap)
+
+
+def _span_depth(c):
+    basic = _lookup(SPAN_DEPTH_RATIOS, c["support"], None)
+    # cl. 23.2.1(b): spans over 10 m, except cantilevers, scale by 10 / span
+    long_span = (c["length"] > 10) & (c["support"] != "cantilever")
+    limit = np.where(long_span, basic * 10 / np.maximum(c["length"], 10), basic)
+    return c["length"] * 1000 / np.maximum(c["d"] - EFFECTIVE_COVER, 0) / limit
+
+
+def _lateral_stability(c):
+    # cl. 23.3: clear span between lateral restraints
+    cantilever = c["support"] == "cantilever"
+    slender = np.where(cantilever, 25, 60) * c["b"]
+    deep = np.where(cantilever, 100, 250) * c["b"] ** 2 / c["d"]
+    return c["length"] * 1000 / np.minimum(slender, deep)
+
+
+def _range(key):
+    low, high = DIMENSION_LIMITS[key]
+    return lambda c: np.maximum(low / c[key], c[key] / high)
+
+
+# (name, citation, utilization function); bit i of the mask is RULES[i]
+RULES = [
+    ("stress", "IS 456 — bending stress vs grade limit", _stress),
+    ("deflection", "IS 456 cl. 23.2", _deflection),
+    ("span_depth", "IS 456 cl. 23.2.1", _span_depth),
+    ("lateral_stability", "IS 456 cl. 23.3", _lateral_stability),
+    ("width", "Section width limits", _range("b")),
+    ("depth", "Section depth limits", _range("d")),
+]
+
+
+def register_rule(name, citation, fn):
+    """Add a rule; ``fn(columns)`` returns the utilization array (fails above 1)."""
+    if any(existing == name for existing, _, _ in RULES):
+        raise ValueError(f"Rule '{name}' already registered")
+    if len(RULES) >= MAX_RULES:
+        raise ValueError(f"At most {MAX_RULES} rules fit in the bitmask")
+    RULES.append((name, citation, fn))
+
+
+def rule_names():
+    return [name for name, _, _ in RULES]
+
+
+# 2. Evaluation
+def allowable_stress(material_key):
+    """Bending stress limit (MPa) for a grade key like "M25": its fck, as stress_check uses."""
+    fck = get_material_properties(material_key).get("fck")
+    if fck is None:
+        match = re.fullmatch(r"M(\d+)", str(material_key))
+        fck = float(match.group(1)) if match else math.nan
+    return fck
+
+
+def _elastic_modulus(material_key):
+    """Concrete modulus (Pa): the material table, else 5000 √fck MPa (IS 456 cl. 6.2.3.1)."""
+    E = get_material_properties(material_key).get("E")
+    if E is None:
+        E = 5000 * math.sqrt(allowable_stress(material_key)) * 1e6
+    return E
+
+
+def check_arrays(length, b, d, allowable_stress, M, deflection, support="simple", element="beam"):
+    """Evaluate every rule over arrays of beams.
+
+    ``length`` in m, ``b`` and ``d`` in mm, ``allowable_stress`` in MPa, ``M``
+    the service moment in kN·m and ``deflection`` in mm. Returns the
+    utilization matrix (rules × beams), the failure bitmask, ``ok`` and the
+    governing rule index and utilization per beam. Missing or zero inputs
+    make a rule fail rather than pass.
+    """
+    length, b, d, allowable_stress, M, deflection = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (length, b, d, allowable_stress, M, deflection))
+    )
+    columns = {
+        "length": length, "b": b, "d": d, "allowable_stress": allowable_stress,
+        "M": np.abs(M), "deflection": np.abs(deflection),
+        "support": np.broadcast_to(np.asarray(support, dtype=str), length.shape),
+        "element": np.broadcast_to(np.asarray(element, dtype=str), length.shape),
+    }
+    utilization = np.empty((len(RULES), length.size))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for i, (_, _, fn) in enumerate(RULES):
+            utilization[i] = np.broadcast_to(fn(columns), length.shape).ravel()
+    utilization = np.nan_to_num(utilization, nan=np.inf, posinf=np.inf, neginf=np.inf)
+
+    bits = np.arange(len(RULES), dtype=np.uint64)[:, None]
+    mask = np.bitwise_or.reduce((utilization > 1).astype(np.uint64) << bits, axis=0)
+    governing = utilization.argmax(axis=0)
+    return {
+        "utilization": utilization,
+        "mask": mask,
+        "ok": mask == 0,
+        "governing": governing,
+        "governing_utilization": utilization[governing, np.arange(length.size)],
+    }
+
+
+def _column(beams, key, default=0.0):
+    return np.array([beam.get(key, default) for beam in beams])
+
+
+def check_beams(beams):
+    """Check a batch of beams given as /calculate-style dicts.
+
+    Each beam has length, b, d, material, loadType and its load (P, a, w,
+    w_max, M_applied), plus optional ``support`` (default "simple") and
+    ``element`` (default "beam"). Moment and deflection follow the support
+    (see beam_actions).
+    """
+    length = _column(beams, "length").astype(float)
+    b = _column(beams, "b").astype(float)
+    d = _column(beams, "d").astype(float)
+    load_type = _column(beams, "loadType", "").astype(str)
+    support = _column(beams, "support", "simple").astype(str)
+    P, w, w_max, M_applied = (_column(beams, key).astype(float) for key in ("P", "w", "w_max", "M_applied"))
+    a = _column(beams, "a", math.nan).astype(float)  # missing: midspan, as in project_costs
+
+    keys, inverse = np.unique(_column(beams, "material", "M20").astype(str), return_inverse=True)
+    allowable = np.array([allowable_stress(key) for key in keys])[inverse]
+    E = np.array([_elastic_modulus(key) for key in keys])[inverse]
+    I = (b / 1000) * (d / 1000) ** 3 / 12
+    M, deflection = beam_actions(load_type, support, length, P, a, w, w_max, M_applied, E, I)
+
+    return check_arrays(
+        length, b, d, allowable, M, deflection, support,
+        _column(beams, "element", "beam").astype(str),
+    )
+
+
+def summarize(result, index=0):
+    """Plain-Python view of one beam of a check result."""
+    names = rule_names()
+    mask = int(result["mask"][index])
+    return {
+        "ok": bool(result["ok"][index]),
+        "mask": mask,
+        "failed": [name for bit, name in enumerate(names) if mask >> bit & 1],
+        "governing": names[int(result["governing"][index])],
+        "governing_utilization": float(result["governing_utilization"][index]),
+        "utilization": {name: float(result["utilization"][i, index]) for i, name in enumerate(names)},
+    }
+
+
+def deflection_limit(length, element="beam"):
+    """Permissible deflection (mm) for a span in m."""
+    ratio, cap = DEFLECTION_LIMITS[element]
+    return min(length * 1000 / ratio, cap)
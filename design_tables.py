@@ -0,0 +1,317 @@
+import bisect
+import datetime
+import itertools
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+
+import numpy as np
+
+from beam_logic import calculate_all, get_material_properties, materials, rectangular_section, stress_check
+from design_rules import DEFLECTION_LIMITS
+
+# Precomputed design lookup tables
+#
+# `python design_tables.py build` evaluates the beam_logic formulas on dense
+# grids over span × load × material × load type (and section depth for the
+# check ratios) and writes one .npy file per quantity plus a metadata file
+# with the axes and measured interpolation error bounds. Workers open the
+# files with mmap_mode="r", so every process shares the same page-cache
+# copy, and answer queries by multilinear interpolation on log-spaced axes.
+#
+# Ratios are stored for a reference width B_REF and scaled exactly to any
+# width (stress ∝ 1/Z and deflection ∝ 1/I are both ∝ 1/b).
+
+DESIGN_TABLES_DIR = os.getenv("DESIGN_TABLES_DIR", os.path.join(tempfile.gettempdir(), "beam_design_tables"))
+METADATA_FILE = "metadata.json"
+TABLE_VERSION = 1
+
+SPAN_RANGE = (1.0, 20.0)        # m
+LOAD_RANGE = (0.5, 500.0)       # kN, kN/m or kN·m depending on the load type
+DEPTH_RANGE = (100.0, 2000.0)   # mm
+N_SPAN, N_LOAD, N_DEPTH = 48, 48, 40
+B_REF = 230.0                   # mm
+D_REF = 500.0                   # mm, section used to evaluate calculate_all
+DEFLECTION_LIMIT_RATIO = DEFLECTION_LIMITS["beam"][0]    # as in /calculate
+LOAD_TYPES = ("point_center", "udl", "uvl", "moment")
+LOAD_PARAMS = {"point_center": "P", "udl": "w", "uvl": "w_max", "moment": "M_applied"}
+QUANTITIES = ("depth_stress", "depth_deflection", "stress_ratio", "deflection_ratio")
+VALIDATION_SAMPLES = 2000
+
+
+def _materials():
+    return sorted(name for name, props in materials.items() if "fck" in props)
+
+
+def _axis(low, high, n):
+    return np.geomspace(low, high, n)
+
+
+# 1. Direct evaluation with the beam_logic formulas
+def evaluate(span, load, material, load_type, depths, b=B_REF):
+    """Stress and deflection ratios (one per depth) and governing required depths (mm).
+
+    calculate_all is run once at the reference section; ratios at other
+    depths follow from rectangular_section (stress ∝ 1/Z, deflection ∝ 1/I).
+    """
+    props = get_material_properties(material)
+    fck, E = props["fck"], props.get("E", 25e9)
+    ref = rectangular_section(b / 1000, D_REF / 1000)
+    params = {LOAD_PARAMS[load_type]: load * 1000}
+    _, _, M_max, _, _, _, _, max_deflection = calculate_all(span, load_type, params, E=E, I=ref["I"])
+    limit = span * 1000 / DEFLECTION_LIMIT_RATIO
+    stress_ref = stress_check(M_max * 1e6, ref["Z"] * 1e9, fck)[0] / fck
+    deflection_ref = max_deflection / limit
+    section = rectangular_section(b / 1000, np.asarray(depths, dtype=float) / 1000)
+    return {
+        "depth_stress": D_REF * np.sqrt(stress_ref),
+        "depth_deflection": D_REF * np.cbrt(deflection_ref),
+        "stress_ratio": stress_ref * ref["Z"] / section["Z"],
+        "deflection_ratio": deflection_ref * ref["I"] / section["I"],
+    }
+
+
+# 2. Build
+def build_tables(directory=DESIGN_TABLES_DIR, n_span=N_SPAN, n_load=N_LOAD, n_depth=N_DEPTH, seed=0):
+    """Compute every grid, measure interpolation error and write the table files."""
+    spans = _axis(*SPAN_RANGE, n_span)
+    loads = _axis(*LOAD_RANGE, n_load)
+    depths = _axis(*DEPTH_RANGE, n_depth)
+    names = _materials()
+    shape = (len(names), len(LOAD_TYPES), n_span, n_load)
+    grids = {
+        "depth_stress": np.empty(shape),
+        "depth_deflection": np.empty(shape),
+        "stress_ratio": np.empty(shape + (n_depth,)),
+        "deflection_ratio": np.empty(shape + (n_depth,)),
+    }
+    for m, material in enumerate(names):
+        for t, load_type in enumerate(LOAD_TYPES):
+            for i, span in enumerate(spans):
+                for j, load in enumerate(loads):
+                    values = evaluate(span, load, material, load_type, depths)
+                    for quantity in QUANTITIES:
+                        grids[quantity][m, t, i, j] = values[quantity]
+
+    os.makedirs(directory, exist_ok=True)
+    for quantity, grid in grids.items():
+        _atomic_save(os.path.join(directory, f"{quantity}.npy"), grid)
+    metadata = {
+        "version": TABLE_VERSION,
+        "built_at": datetime.datetime.utcnow().isoformat() + "Z",
+        "materials": names,
+        "load_types": list(LOAD_TYPES),
+        "span": spans.tolist(),
+        "load": loads.tolist(),
+        "depth": depths.tolist(),
+        "b_ref": B_REF,
+        "deflection_limit_ratio": DEFLECTION_LIMIT_RATIO,
+    }
+    tables = DesignTables(metadata, grids)
+    metadata["error_bounds"] = tables.measure_errors(VALIDATION_SAMPLES, seed)
+    # Metadata is written last: its presence marks a complete set of tables
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".json.tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(tmp_path, os.path.join(directory, METADATA_FILE))
+    return metadata
+
+
+def _atomic_save(path, array):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".npy.tmp")
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+# 3. Lookup
+def _locate(axis, values, name):
+    """Cell index and weight of ``values`` on a log-spaced ``axis``."""
+    values = np.asarray(values, dtype=float)
+    if np.any(values < axis[0]) or np.any(values > axis[-1]):
+        raise ValueError(f"{name} outside table range {axis[0]:g}–{axis[-1]:g}")
+    log_axis = np.log(axis)
+    i = np.clip(np.searchsorted(axis, values, side="right") - 1, 0, len(axis) - 2)
+    t = (np.log(values) - log_axis[i]) / (log_axis[i + 1] - log_axis[i])
+    return i, t
+
+
+def _locate_scalar(axis, log_axis, value, name):
+    """``_locate`` for one number with plain-Python arithmetic (no array overhead)."""
+    if not axis[0] <= value <= axis[-1]:
+        raise ValueError(f"{name} outside table range {axis[0]:g}–{axis[-1]:g}")
+    i = min(max(bisect.bisect_right(axis, value) - 1, 0), len(axis) - 2)
+    return i, (math.log(value) - log_axis[i]) / (log_axis[i + 1] - log_axis[i])
+
+
+class DesignTables:
+    def __init__(self, metadata, grids):
+        self.metadata = metadata
+        # Plain ndarray views of the memory maps: same pages, cheaper indexing
+        self.grids = {quantity: np.asarray(grid) for quantity, grid in grids.items()}
+        self.spans = np.asarray(metadata["span"])
+        self.loads = np.asarray(metadata["load"])
+        self.depths = np.asarray(metadata["depth"])
+        self._axes = {name: (list(metadata[name]), [math.log(v) for v in metadata[name]])
+                      for name in ("span", "load", "depth")}
+
+    def _indices(self, material, load_type):
+        try:
+            return self.metadata["materials"].index(material), self.metadata["load_types"].index(load_type)
+        except ValueError:
+            raise ValueError(f"No table for material '{material}' and load type '{load_type}'")
+
+    @staticmethod
+    def _interpolate(grid, cells):
+        """Multilinear interpolation of ``grid`` at ``cells`` = [(index, weight), ...], one per axis."""
+        value = 0.0
+        for corner in itertools.product((0, 1), repeat=len(cells)):
+            weight = 1.0
+            index = []
+            for (i, t), upper in zip(cells, corner):
+                weight = weight * (t if upper else 1 - t)
+                index.append(i + upper)
+            value = value + grid[tuple(index)] * weight
+        return value
+
+    def lookup(self, span, load, material, load_type, b=B_REF, depth=None):
+        """Required depth (mm) and, when ``depth`` is given, the check ratios.
+
+        ``span`` (m), ``load`` and ``depth`` (mm) may be arrays of the same
+        shape. Results carry the stated error bounds for the load type.
+        """
+        m, lt = self._indices(material, load_type)
+        if all(v is None or isinstance(v, (int, float)) for v in (span, load, b, depth)):
+            return self._lookup_scalar(m, lt, float(span), float(load), float(b),
+                                       None if depth is None else float(depth), load_type)
+        i, s = _locate(self.spans, span, "span")
+        j, t = _locate(self.loads, load, "load")
+        scale = B_REF / np.asarray(b, dtype=float)
+        cells = [(i, s), (j, t)]
+        depth_stress = self._interpolate(self.grids["depth_stress"][m, lt], cells) * np.sqrt(scale)
+        depth_deflection = self._interpolate(self.grids["depth_deflection"][m, lt], cells) * np.cbrt(scale)
+        result = {
+            "required_depth": np.maximum(depth_stress, depth_deflection),
+            "governing": np.where(depth_stress >= depth_deflection, "stress", "deflection"),
+            "depth_for_stress": depth_stress,
+            "depth_for_deflection": depth_deflection,
+        }
+        if depth is not None:
+            cells.append(_locate(self.depths, depth, "depth"))
+            for quantity in ("stress_ratio", "deflection_ratio"):
+                result[quantity] = self._interpolate(self.grids[quantity][m, lt], cells) * scale
+        result["error_bounds"] = self.metadata.get("error_bounds", {}).get(load_type, {})
+        return result
+
+    @staticmethod
+    def _interpolate_scalar(grid, prefix, cells):
+        """``_interpolate`` for one point: fetch the 2^n corner block once, reduce axis by axis."""
+        block = grid[prefix + tuple(slice(i, i + 2) for i, _ in cells)].ravel().tolist()
+        for _, t in reversed(cells):
+            block = [low + (high - low) * t for low, high in zip(block[0::2], block[1::2])]
+        return block[0]
+
+    def _lookup_scalar(self, m, lt, span, load, b, depth, load_type):
+        cells = [_locate_scalar(*self._axes["span"], span, "span"), _locate_scalar(*self._axes["load"], load, "load")]
+        scale = B_REF / b
+        depth_stress = self._interpolate_scalar(self.grids["depth_stress"], (m, lt), cells) * math.sqrt(scale)
+        depth_deflection = self._interpolate_scalar(self.grids["depth_deflection"], (m, lt), cells) * scale ** (1 / 3)
+        result = {
+            "required_depth": max(depth_stress, depth_deflection),
+            "governing": "stress" if depth_stress >= depth_deflection else "deflection",
+            "depth_for_stress": depth_stress,
+            "depth_for_deflection": depth_deflection,
+        }
+        if depth is not None:
+            cells.append(_locate_scalar(*self._axes["depth"], depth, "depth"))
+            for quantity in ("stress_ratio", "deflection_ratio"):
+                result[quantity] = self._interpolate_scalar(self.grids[quantity], (m, lt), cells) * scale
+        result["error_bounds"] = self.metadata.get("error_bounds", {}).get(load_type, {})
+        return result
+
+    def measure_errors(self, samples, seed=0):
+        """Largest interpolation error against direct evaluation at random points, per load type.
+
+        Relative errors are taken where the exact value is at least 0.05
+        (ratios) or 10 mm (depths); smaller values carry absolute errors.
+        """
+        rng = np.random.default_rng(seed)
+        bounds = {}
+        for load_type in self.metadata["load_types"]:
+            rel = {q: 0.0 for q in QUANTITIES}
+            abs_ = {q: 0.0 for q in QUANTITIES}
+            for _ in range(samples // len(self.metadata["load_types"])):
+                material = self.metadata["materials"][rng.integers(len(self.metadata["materials"]))]
+                span = np.exp(rng.uniform(*np.log(SPAN_RANGE)))
+                load = np.exp(rng.uniform(*np.log(LOAD_RANGE)))
+                depth = np.exp(rng.uniform(*np.log(DEPTH_RANGE)))
+                exact = evaluate(span, load, material, load_type, [depth])
+                approx = self.lookup(span, load, material, load_type, depth=depth)
+                approx["depth_stress"] = approx["depth_for_stress"]
+                approx["depth_deflection"] = approx["depth_for_deflection"]
+                for q in QUANTITIES:
+                    e, a = float(np.ravel(exact[q])[0]), float(np.ravel(approx[q])[0])
+                    floor = 10.0 if q.startswith("depth") else 0.05
+                    if abs(e) >= floor:
+                        rel[q] = max(rel[q], abs(a - e) / abs(e))
+                    else:
+                        abs_[q] = max(abs_[q], abs(a - e))
+            bounds[load_type] = {q: {"max_rel_error": rel[q], "max_abs_error_small": abs_[q]} for q in QUANTITIES}
+        return bounds
+
+
+_tables = None
+_tables_lock = threading.Lock()
+
+
+def load_tables(directory=DESIGN_TABLES_DIR):
+    """Open the tables memory-mapped (building them first if missing or stale) and cache them per process."""
+    global _tables
+    if _tables is None:
+        with _tables_lock:
+            if _tables is None:
+                path = os.path.join(directory, METADATA_FILE)
+                metadata = None
+                if os.path.exists(path):
+                    with open(path) as f:
+                        metadata = json.load(f)
+                # Tables built with another version or deflection limit are stale
+                if (metadata is None or metadata.get("version") != TABLE_VERSION
+                        or metadata.get("deflection_limit_ratio") != DEFLECTION_LIMIT_RATIO):
+                    print(f"🔄 Building design tables in {directory}")
+                    build_tables(directory)
+                    with open(path) as f:
+                        metadata = json.load(f)
+                grids = {q: np.load(os.path.join(directory, f"{q}.npy"), mmap_mode="r") for q in QUANTITIES}
+                _tables = DesignTables(metadata, grids)
+    return _tables
+
+
+def design_lookup(span, load, material, load_type, b=B_REF, depth=None):
+    """Single lookup for the web API; returns plain floats."""
+    result = load_tables().lookup(span, load, material, load_type, b, depth)
+    out = {key: np.asarray(value).item() for key, value in result.items() if key != "error_bounds"}
+    out["error_bounds"] = result["error_bounds"]
+    if depth is not None:
+        out["stress_ok"] = out["stress_ratio"] <= 1
+        out["deflection_ok"] = out["deflection_ratio"] <= 1
+    return out
+
+
+if __name__ == "__main__":
+    # python design_tables.py build [DIR]
+    # python design_tables.py query SPAN LOAD MATERIAL LOAD_TYPE [B] [DEPTH]
+    command = sys.argv[1] if len(sys.argv) > 1 else "build"
+    if command == "build":
+        directory = sys.argv[2] if len(sys.argv) > 2 else DESIGN_TABLES_DIR
+        metadata = build_tables(directory)
+        print(f"✅ Design tables written to {directory}")
+        print(json.dumps(metadata["error_bounds"], indent=2))
+    elif command == "query":
+        span, load, material, load_type = float(sys.argv[2]), float(sys.argv[3]), sys.argv[4], sys.argv[5]
+        b = float(sys.argv[6]) if len(sys.argv) > 6 else B_REF
+        depth = float(sys.argv[7]) if len(sys.argv) > 7 else None
+        print(json.dumps(design_lookup(span, load, material, load_type, b, depth), indent=2))
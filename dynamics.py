@@ -0,0 +1,237 @@
+import numpy as np
+
+from beam_logic import get_material_properties, rectangular_section
+
+# Modal analysis of Euler-Bernoulli beams
+#
+# All functions take arrays over a batch of beams (leading axis B). Simply
+# supported beams use the closed-form solution; other supports are solved
+# with a batched finite-element eigenproblem. Units: m, Pa, kg, s.
+
+SUPPORTS = ("simple", "cantilever", "fixed", "propped")
+DEFAULT_DENSITY = 2500  # kg/m³, reinforced concrete
+DEFAULT_DAMPING = 0.02  # ratio of critical, per mode
+WALKER_WEIGHT = 700     # N
+FOOTFALL_DLF = (0.41, 0.069, 0.056)  # dynamic load factors of the first three walking harmonics
+MAX_MODES = 20
+MIN_DT = 1e-4           # s
+MAX_STEPS = 200_000     # time steps per history (each is one Python-level recurrence step)
+
+
+# 1. Beam properties
+def beam_properties(length, b, d, material):
+    """E (Pa), I (m⁴) and mass per length (kg/m) as /calculate defines a beam.
+
+    ``length`` in m, ``b`` and ``d`` in mm, ``material`` a material key or
+    an array of keys.
+    """
+    length = np.asarray(length, dtype=float)
+    b = np.asarray(b, dtype=float) / 1000
+    d = np.asarray(d, dtype=float) / 1000
+    keys, inverse = np.unique(np.asarray(material, dtype=str), return_inverse=True)
+    props = [get_material_properties(key) for key in keys]
+    E = np.array([p.get("E", 25e9) for p in props])[inverse].reshape(np.shape(material))
+    density = np.array([p.get("density", DEFAULT_DENSITY) for p in props])[inverse].reshape(np.shape(material))
+    section = rectangular_section(b, d)
+    length, E, I, m = np.broadcast_arrays(length, E, section["I"], section["A"] * density)
+    return {"L": length, "E": E, "I": I, "m": m}
+
+
+# 2. Closed form (simply supported)
+def simply_supported_modes(L, E, I, m, n_modes=3, n_points=21):
+    """Frequencies (Hz) and mass-normalised mode shapes of simply supported beams."""
+    L, E, I, m = (np.atleast_1d(np.asarray(v, dtype=float)) for v in (L, E, I, m))
+    n = np.arange(1, n_modes + 1)
+    omega = (n * np.pi / L[:, None]) ** 2 * np.sqrt(E * I / m)[:, None]
+    xi = np.linspace(0, 1, n_points)
+    shapes = np.sqrt(2 / (m * L))[:, None, None] * np.sin(np.pi * n[:, None] * xi)[None, :, :]
+    return {"frequencies": omega / (2 * np.pi), "omega": omega, "xi": xi, "shapes": shapes}
+
+
+# 3. Finite elements (any support)
+def _element_matrices(le, EI, m):
+    """Stiffness and consistent mass of one beam element for each beam, shape (B, 4, 4).
+
+    DOFs per element are (v1, θ1, v2, θ2); every rotation DOF carries one
+    power of the element length.
+    """
+    le = le[:, None, None]
+    rotation = np.array([0, 1, 0, 1])
+    k = np.array([[12, 6, -12, 6], [6, 4, -6, 2], [-12, -6, 12, -6], [6, 2, -6, 4]], dtype=float)
+    ke = EI[:, None, None] * k / le ** (3 - rotation[:, None] - rotation[None, :])
+    mm = np.array([[156, 22, 54, -13], [22, 4, 13, -3], [54, 13, 156, -22], [-13, -3, -22, 4]], dtype=float)
+    me = m[:, None, None] / 420 * mm * le ** (1 + rotation[:, None] + rotation[None, :])
+    return ke, me
+
+
+def _fixed_dofs(support, n_nodes):
+    last = 2 * (n_nodes - 1)
+    return {
+        "simple": [0, last],
+        "cantilever": [0, 1],
+        "fixed": [0, 1, last, last + 1],
+        "propped": [0, 1, last],
+    }[support]
+
+
+def fe_modes(L, E, I, m, n_modes=3, support="simple", n_elements=20):
+    """Frequencies (Hz) and mass-normalised mode shapes by a batched eigen-solve.
+
+    Solves K·φ = ω²·M·φ for every beam at once via a Cholesky reduction of
+    the consistent mass matrix to a standard symmetric problem.
+    """
+    if support not in SUPPORTS:
+        raise ValueError(f"Unknown support '{support}'")
+    L, E, I, m = (np.atleast_1d(np.asarray(v, dtype=float)) for v in (L, E, I, m))
+    batch = len(L)
+    n_nodes = n_elements + 1
+    ndof = 2 * n_nodes
+    ke, me = _element_matrices(L / n_elements, E * I, m)
+    K = np.zeros((batch, ndof, ndof))
+    M = np.zeros((batch, ndof, ndof))
+    for e in range(n_elements):
+        dofs = slice(2 * e, 2 * e + 4)
+        K[:, dofs, dofs] += ke
+        M[:, dofs, dofs] += me
+
+    free = np.setdiff1d(np.arange(ndof), _fixed_dofs(support, n_nodes))
+    K = K[:, free][:, :, free]
+    M = M[:, free][:, :, free]
+    chol = np.linalg.cholesky(M)
+    inv_chol = np.linalg.inv(chol)
+    A = inv_chol @ K @ np.swapaxes(inv_chol, 1, 2)
+    eigvals, eigvecs = np.linalg.eigh(A)
+    eigvals = eigvals[:, :n_modes]
+    vectors = np.swapaxes(inv_chol, 1, 2) @ eigvecs[:, :, :n_modes]
+
+    full = np.zeros((batch, ndof, n_modes))
+    full[:, free] = vectors
+    shapes = np.swapaxes(full[:, 0::2], 1, 2)
+    # Sign convention: largest translation positive
+    peak = np.take_along_axis(shapes, np.abs(shapes).argmax(axis=2)[:, :, None], axis=2)
+    shapes = shapes * np.sign(peak)
+    omega = np.sqrt(np.maximum(eigvals, 0))
+    return {
+        "frequencies": omega / (2 * np.pi),
+        "omega": omega,
+        "xi": np.linspace(0, 1, n_nodes),
+        "shapes": shapes,
+    }
+
+
+def modal_analysis(L, E, I, m, n_modes=3, support="simple", n_elements=20):
+    """First ``n_modes`` frequencies and mode shapes for a batch of beams."""
+    if not 1 <= n_modes <= MAX_MODES:
+        raise ValueError(f"n_modes must be between 1 and {MAX_MODES}")
+    if support == "simple":
+        return simply_supported_modes(L, E, I, m, n_modes, n_elements + 1)
+    return fe_modes(L, E, I, m, n_modes, support, n_elements)
+
+
+def shape_at(modes, position):
+    """Mode shape ordinates (B, n_modes) at ``position`` given as a fraction of span."""
+    xi = modes["xi"]
+    i = min(max(np.searchsorted(xi, position, side="right") - 1, 0), len(xi) - 2)
+    t = (position - xi[i]) / (xi[i + 1] - xi[i])
+    return modes["shapes"][:, :, i] * (1 - t) + modes["shapes"][:, :, i + 1] * t
+
+
+# 4. Loads
+def harmonic_load(amplitude, frequency):
+    """F(t) = amplitude · sin(2π·frequency·t), in N."""
+    return lambda t: amplitude * np.sin(2 * np.pi * frequency * t)
+
+
+def footfall_load(pace_frequency=2.0, weight=WALKER_WEIGHT, dlf=FOOTFALL_DLF):
+    """Fourier-series walking load: weight · Σ dlf_h · sin(2π·h·f·t) (static part omitted)."""
+    def load(t):
+        return weight * sum(a * np.sin(2 * np.pi * (h + 1) * pace_frequency * t) for h, a in enumerate(dlf))
+    return load
+
+
+# 5. Modal superposition time history
+def _recurrence_coefficients(omega, zeta, dt):
+    """Exact piecewise-linear-load recurrence (Nigam-Jennings) for unit modal mass."""
+    k = omega ** 2
+    root = np.sqrt(1 - zeta ** 2)
+    wd = omega * root
+    e = np.exp(-zeta * omega * dt)
+    s = np.sin(wd * dt)
+    c = np.cos(wd * dt)
+    A = e * (zeta / root * s + c)
+    B = e * s / wd
+    C = (2 * zeta / (omega * dt) + e * (((1 - 2 * zeta ** 2) / (wd * dt) - zeta / root) * s
+                                       - (1 + 2 * zeta / (omega * dt)) * c)) / k
+    D = (1 - 2 * zeta / (omega * dt) + e * ((2 * zeta ** 2 - 1) / (wd * dt) * s
+                                           + 2 * zeta / (omega * dt) * c)) / k
+    Ap = -e * omega / root * s
+    Bp = e * (c - zeta / root * s)
+    Cp = (-1 / dt + e * ((omega / root + zeta / (dt * root)) * s + c / dt)) / k
+    Dp = (1 - e * (zeta / root * s + c)) / (k * dt)
+    return A, B, C, D, Ap, Bp, Cp, Dp
+
+
+def stream_time_history(modes, load, duration, dt=0.005, load_position=0.5,
+                        output_position=0.5, damping=DEFAULT_DAMPING, chunk_steps=1000):
+    """Modal-superposition response to a point load, yielded in chunks.
+
+    ``load`` is a function of time (s) returning force in N. Each chunk is a
+    dict with ``t`` (nt,), ``displacement`` (B, nt) in mm and
+    ``acceleration`` (B, nt) in m/s² at ``output_position``. Memory stays
+    bounded by ``chunk_steps`` whatever the duration. Arguments are checked
+    here, before the first chunk is requested, and raise ValueError.
+    """
+    if not MIN_DT <= dt:
+        raise ValueError(f"dt must be at least {MIN_DT} s")
+    if not 0 < duration:
+        raise ValueError("duration must be positive")
+    n_steps = int(round(duration / dt)) + 1
+    if n_steps > MAX_STEPS:
+        raise ValueError(f"duration / dt gives {n_steps} steps; at most {MAX_STEPS} are allowed")
+    if not 0 <= damping < 1:
+        raise ValueError("damping must be at least 0 and below 1 (ratio of critical)")
+    for name, position in (("load_position", load_position), ("output_position", output_position)):
+        if not 0 <= position <= 1:
+            raise ValueError(f"{name} must be between 0 and 1 (fraction of span)")
+    if not np.all(modes["omega"] > 0):
+        raise ValueError("Every mode needs a positive frequency")
+    return _time_history_chunks(modes, load, n_steps, dt, load_position, output_position, damping, chunk_steps)
+
+
+def _time_history_chunks(modes, load, n_steps, dt, load_position, output_position, damping, chunk_steps):
+    omega = modes["omega"]
+    coefficients = _recurrence_coefficients(omega, damping, dt)
+    A, B, C, D, Ap, Bp, Cp, Dp = coefficients
+    phi_in = shape_at(modes, load_position)
+    phi_out = shape_at(modes, output_position)
+
+    q = np.zeros_like(omega)
+    v = np.zeros_like(omega)
+    p_prev = phi_in * load(0.0)
+    for start in range(0, n_steps, chunk_steps):
+        t = np.arange(start, min(start + chunk_steps, n_steps)) * dt
+        forces = np.asarray(load(t), dtype=float) * np.ones_like(t)
+        q_chunk = np.empty(omega.shape + (len(t),))
+        a_chunk = np.empty_like(q_chunk)
+        for j, f in enumerate(forces):
+            p = phi_in * f
+            if start + j > 0:
+                q, v = A * q + B * v + C * p_prev + D * p, Ap * q + Bp * v + Cp * p_prev + Dp * p
+            q_chunk[..., j] = q
+            a_chunk[..., j] = p - 2 * damping * omega * v - omega ** 2 * q
+            p_prev = p
+        yield {
+            "t": t,
+            "displacement": np.einsum("bm,bmt->bt", phi_out, q_chunk) * 1000,
+            "acceleration": np.einsum("bm,bmt->bt", phi_out, a_chunk),
+        }
+
+
+def peak_response(modes, load, duration, **kwargs):
+    """Peak |displacement| (mm) and |acceleration| (m/s²) per beam without storing the history."""
+    peak_disp = np.zeros(len(modes["omega"]))
+    peak_acc = np.zeros(len(modes["omega"]))
+    for chunk in stream_time_history(modes, load, duration, **kwargs):
+        peak_disp = np.maximum(peak_disp, np.abs(chunk["displacement"]).max(axis=1))
+        peak_acc = np.maximum(peak_acc, np.abs(chunk["acceleration"]).max(axis=1))
+    return {"peak_displacement": peak_disp, "peak_acceleration": peak_acc}
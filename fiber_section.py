@@ -0,0 +1,298 @@
+import numpy as np
+
+from beam_logic import profile_at
+from nonprismatic import deflection_from_curvature
+from reinforcement import ES
+
+# Fiber-section analysis of cracked RC rectangular sections
+#
+# The section is split into horizontal concrete fibers plus tension and
+# compression steel layers. Concrete follows the IS 456 parabola-rectangle
+# curve in compression and is linear up to cracking in tension (no tension
+# beyond fcr); steel is elastic-perfectly-plastic. For a given strain state
+# the neutral axis is found by safeguarded Newton iteration on axial force
+# equilibrium. All fibers of all sections are integrated as one 2-D array,
+# so a batch of sections (or every point of a moment–curvature curve) is
+# solved together.
+#
+# Units: mm, N/mm² (MPa), kN·m; strains compression positive. Curvatures
+# are reported in 1/m, the unit nonprismatic.deflection_from_curvature takes.
+
+ECU = 0.0035       # Ultimate compressive strain of concrete (cl. 38.1)
+EPS_C0 = 0.002     # Strain at peak stress of the parabola
+N_FIBERS = 50
+MAX_ITER = 60
+TOLERANCE = 1e-9   # Residual axial force relative to fc·b·D
+
+
+# 1. Material laws (stress, tangent modulus)
+def concrete_law(eps, fc, Ec, eps_cr):
+    e = np.clip(eps, 0.0, EPS_C0) / EPS_C0
+    stress = fc * e * (2 - e)
+    tangent = (2 * fc / EPS_C0) * (1 - e) * (eps > 0)
+    uncracked = (eps < 0) & (eps >= -eps_cr)
+    stress += Ec * eps * uncracked
+    tangent += Ec * uncracked
+    return stress, tangent
+
+
+def steel_law(eps, fy):
+    stress = np.clip(ES * eps, -fy, fy)
+    tangent = np.where(np.abs(ES * eps) < fy, ES, 0.0)
+    return stress, tangent
+
+
+# 2. Section discretization
+def _section(b, D, Ast, fck, fy, cover, Asc, cover_c, n_fibers, fc):
+    b, D, Ast, fck, fy, cover, Asc, cover_c = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (b, D, Ast, fck, fy, cover, Asc, cover_c)))
+    fck = fck.ravel()
+    Ec = 5000 * np.sqrt(fck)                       # cl. 6.2.3.1
+    fcr = 0.7 * np.sqrt(fck)                       # cl. 6.2.2
+    D = D.ravel()
+    return {
+        "b": b.ravel(), "D": D, "d": D - cover.ravel(),
+        "fc": 0.67 * fck if fc is None else np.broadcast_to(np.asarray(fc, dtype=float), D.shape).ravel(),
+        "fy": fy.ravel(), "Ec": Ec, "eps_cr": fcr / Ec, "fcr": fcr,
+        "y_c": (np.arange(n_fibers) + 0.5) / n_fibers * D[:, None],
+        "A_c": (b.ravel() * D / n_fibers)[:, None],
+        "y_s": np.stack([D - cover.ravel(), cover_c.ravel()], axis=1),
+        "A_s": np.stack([Ast.ravel(), Asc.ravel()], axis=1),
+    }
+
+
+def _take(sec, index):
+    return {key: value[index] for key, value in sec.items()}
+
+
+def _forces(sec, c, k, dk, moment=False):
+    """Axial force N (N) and dN/dc, or the moment (N·mm), for strains k·(c − y), k depending on c."""
+    c = c[:, None]
+    k = k[:, None]
+    arm_c = c - sec["y_c"]
+    arm_s = c - sec["y_s"]
+    sig_c, et_c = concrete_law(k * arm_c, sec["fc"][:, None], sec["Ec"][:, None], sec["eps_cr"][:, None])
+    sig_s, et_s = steel_law(k * arm_s, sec["fy"][:, None])
+    if moment:
+        return (sig_c * arm_c).sum(axis=1) * sec["A_c"][:, 0] + (sig_s * sec["A_s"] * arm_s).sum(axis=1)
+    dk = dk[:, None]
+    N = sig_c.sum(axis=1) * sec["A_c"][:, 0] + (sig_s * sec["A_s"]).sum(axis=1)
+    dN = (et_c * (k + dk * arm_c)).sum(axis=1) * sec["A_c"][:, 0] \
+        + (et_s * (k + dk * arm_s) * sec["A_s"]).sum(axis=1)
+    return N, dN
+
+
+def _solve(sec, strain_slope, hi):
+    """Neutral-axis depth c with zero axial force, bracketed in (0, hi).
+
+    ``strain_slope(c, rows)`` returns (k, dk/dc) for the given rows so that
+    fiber strains are k·(c − y). Newton steps that leave the bracket or meet
+    a zero tangent fall back to bisection, so every section converges even
+    across cracking and yielding; converged rows drop out of later passes.
+    """
+    lo = np.zeros_like(hi)
+    hi = hi.copy()
+    c = 0.5 * hi
+    scale = TOLERANCE * sec["fc"] * sec["b"] * sec["D"]
+    active = np.arange(len(c))
+    part = sec
+    for _ in range(MAX_ITER):
+        k, dk = strain_slope(c[active], active)
+        N, dN = _forces(part, c[active], k, dk)
+        pending = np.abs(N) > scale[active]
+        active, N, dN = active[pending], N[pending], dN[pending]
+        if not len(active):
+            break
+        part = _take(sec, active)
+        ca, la, ha = c[active], lo[active], hi[active]
+        la = np.where(N < 0, ca, la)
+        ha = np.where(N > 0, ca, ha)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = ca - N / dN
+        newton = (dN > 0) & (step > la) & (step < ha)
+        c[active] = np.where(newton, step, 0.5 * (la + ha))
+        lo[active], hi[active] = la, ha
+    k, _ = strain_slope(c, np.arange(len(c)))
+    return c, k, _forces(sec, c, k, None, moment=True)
+
+
+def _state(sec, c, k, M):
+    return {
+        "curvature": k * 1000,
+        "neutral_axis": c,
+        "moment": M / 1e6,
+        "top_strain": k * c,
+        "steel_strain": k * (c - sec["d"]),
+    }
+
+
+def solve_curvature(sec, phi):
+    """Equilibrium state at curvatures ``phi`` (1/mm), one per section."""
+    phi = np.asarray(phi, dtype=float)
+    phi = np.broadcast_to(phi, sec["D"].shape)
+    c, k, M = _solve(sec, lambda c, rows: (phi[rows], np.zeros_like(c)), sec["D"])
+    return _state(sec, c, k, M)
+
+
+def solve_strain_at(sec, depth, target):
+    """Equilibrium state with strain ``target`` at ``depth`` (mm from the top)."""
+    depth = np.broadcast_to(np.asarray(depth, dtype=float), sec["D"].shape)
+    target = np.broadcast_to(np.asarray(target, dtype=float), sec["D"].shape)
+    hi = np.where(target > 0, sec["D"], depth * (1 - 1e-9))
+    c, k, M = _solve(sec, lambda c, rows: (target[rows] / (c - depth[rows]),
+                                           -target[rows] / (c - depth[rows]) ** 2), hi)
+    return _state(sec, c, k, M)
+
+
+# 3. Moment–curvature curves
+def moment_curvature(b, D, Ast, fck, fy, cover=50, Asc=0.0, cover_c=50, n_points=30,
+                     n_fibers=N_FIBERS, fc=None):
+    """Moment–curvature curves for a batch of rectangular sections.
+
+    ``b``, ``D``, ``cover`` (to the tension steel centroid) in mm, ``Ast``
+    and ``Asc`` in mm², ``fck``/``fy`` in MPa; ``fc`` defaults to 0.67·fck.
+    Curves run from zero to the curvature at which the top fiber reaches
+    ECU and are returned as (n_sections, n_points + 3) arrays, along with
+    the cracking, first-yield and ultimate points of each section.
+    """
+    sec = _section(b, D, Ast, fck, fy, cover, Asc, cover_c, n_fibers, fc)
+    n = len(sec["D"])
+    ultimate = solve_strain_at(sec, 0.0, ECU)
+    cracking = solve_strain_at(sec, sec["D"], -sec["eps_cr"])
+    yielding = solve_strain_at(sec, sec["d"], -sec["fy"] / ES)
+    ductile = yielding["top_strain"] <= ECU
+    phi_cr = cracking["curvature"] / 1000
+    phi_u = ultimate["curvature"] / 1000
+
+    # Every point of every curve is solved in one batch; the exact cracking,
+    # yield and ultimate states are merged in so the kinks are not smeared
+    t = np.geomspace(1e-2, 1.0, n_points)
+    phi = phi_cr[:, None] * 0.1 + (phi_u - 0.1 * phi_cr)[:, None] * t
+    batch = _take(sec, np.repeat(np.arange(n), n_points))
+    state = solve_curvature(batch, phi.ravel())
+    key_points = [cracking, {key: np.where(ductile, value, ultimate[key]) for key, value in yielding.items()}]
+    curve = {}
+    for key, value in state.items():
+        zero = np.full((n, 1), np.nan if key == "neutral_axis" else 0.0)
+        curve[key] = np.hstack([zero, value.reshape(n, n_points)] + [p[key][:, None] for p in key_points])
+    order = np.argsort(curve["curvature"], axis=1, kind="stable")
+    curve = {key: np.take_along_axis(value, order, axis=1) for key, value in curve.items()}
+    curve["neutral_axis"][:, 0] = cracking["neutral_axis"]
+
+    curve.update({
+        "M_cr": cracking["moment"],
+        "phi_cr": cracking["curvature"],
+        "M_y": np.where(ductile, yielding["moment"], np.nan),
+        "phi_y": np.where(ductile, yielding["curvature"], np.nan),
+        "M_u": np.maximum(ultimate["moment"], curve["moment"].max(axis=1)),
+        "phi_u": ultimate["curvature"],
+        "x_u": ultimate["neutral_axis"],
+        "ductile": ductile,
+    })
+    return curve
+
+
+def curvature_for_moment(curve, M):
+    """Curvature (1/m) reaching moment ``M`` (kN·m) on each section's curve.
+
+    ``M`` has one row per section (any number of columns). The curve's
+    running maximum is used, so a drop in moment at cracking shows up as a
+    jump in curvature. Moments beyond the section capacity give NaN.
+    """
+    phi, moment = curve["curvature"], curve["moment"]
+    envelope = np.maximum.accumulate(moment, axis=1)
+    M = np.abs(np.asarray(M, dtype=float))
+    M = M.reshape(len(phi), -1)
+    idx = (envelope[:, None, :] < M[:, :, None]).sum(axis=2)
+    inside = idx < phi.shape[1]
+    hi = np.minimum(idx, phi.shape[1] - 1)
+    lo = np.maximum(hi - 1, 0)
+    rows = np.arange(len(phi))[:, None]
+    m_lo, m_hi = envelope[rows, lo], envelope[rows, hi]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(m_hi > m_lo, (M - m_lo) / (m_hi - m_lo), 0.0)
+    result = phi[rows, lo] + np.clip(t, 0, 1) * (phi[rows, hi] - phi[rows, lo])
+    return np.where(inside, result, np.nan)
+
+
+# 4. Section response at a moment and cracked deflections
+def section_state(b, D, Ast, fck, fy, M, cover=50, Asc=0.0, cover_c=50, n_fibers=N_FIBERS):
+    """Neutral axis, strains and stresses of a batch of sections under moments ``M`` (kN·m)."""
+    curve = moment_curvature(b, D, Ast, fck, fy, cover, Asc, cover_c, n_fibers=n_fibers)
+    M = np.broadcast_to(np.abs(np.asarray(M, dtype=float)).ravel(), curve["M_cr"].shape)
+    phi = curvature_for_moment(curve, M[:, None])[:, 0]
+    sec = _section(b, D, Ast, fck, fy, cover, Asc, cover_c, n_fibers, None)
+    failed = np.isnan(phi)
+    state = solve_curvature(sec, np.where(failed, curve["phi_u"], phi) / 1000)
+    state["steel_stress"] = steel_law(state["steel_strain"], sec["fy"])[0]
+    state["top_stress"] = concrete_law(state["top_strain"], sec["fc"], sec["Ec"], sec["eps_cr"])[0]
+    state["cracked"] = M > curve["M_cr"]
+    state["failed"] = failed
+    for key in ("M_cr", "M_y", "M_u"):
+        state[key] = curve[key]
+    return state
+
+
+def stress_profile(b, D, Ast, fck, fy, M, cover=50, n_points=20):
+    """Concrete stresses over the depth of one section under moment ``M`` (kN·m).
+
+    Same shape as the /calculate ``stress_profile`` (depths in mm from the
+    top, stresses in MPa, compression positive) plus the neutral axis and
+    steel stress.
+    """
+    state = section_state(b, D, Ast, fck, fy, M, cover)
+    sec = _section(b, D, Ast, fck, fy, cover, 0.0, 50, 1, None)
+    depths = np.linspace(0, float(D), n_points)
+    k = state["curvature"][0] / 1000
+    stresses, _ = concrete_law(k * (state["neutral_axis"][0] - depths), sec["fc"][0], sec["Ec"][0], sec["eps_cr"][0])
+    return {
+        "depths": depths.tolist(),
+        "stresses": stresses.tolist(),
+        "neutral_axis": float(state["neutral_axis"][0]),
+        "steel_stress": float(state["steel_stress"][0]),
+        "cracked": bool(state["cracked"][0]),
+        "failed": bool(state["failed"][0]),
+    }
+
+
+def cracked_deflection(L, load_type, params, b, D, Ast, fck, fy, cover=50, n_stations=201):
+    """Deflection of a simply supported RC beam from fiber-section curvatures.
+
+    Loads are the /calculate parameters in N, N/m and N·m. Cracked regions
+    pick up their larger curvature from the moment–curvature curve, so this
+    is the short-term deflection of the cracked member (no creep or
+    shrinkage). ``max_deflection`` is None when the moment exceeds capacity.
+    """
+    x = np.linspace(0, L, n_stations)
+    _, M, _ = profile_at(x, L, load_type, params)
+    curve = moment_curvature(b, D, Ast, fck, fy, cover)
+    kappa = np.sign(M) * curvature_for_moment(curve, M[None, :])[0]
+    failed = bool(np.isnan(kappa).any())
+    _, deflection = deflection_from_curvature(x, np.nan_to_num(kappa))
+    return {
+        "x": x,
+        "M": M,
+        "curvature": kappa,
+        "deflection": deflection,
+        "max_deflection": None if failed else float(np.abs(deflection).max()),
+        "cracked_length": float(L * (np.abs(M) > curve["M_cr"][0]).mean()),
+        "M_cr": float(curve["M_cr"][0]),
+        "M_y": float(curve["M_y"][0]),
+        "M_u": float(curve["M_u"][0]),
+        "failed": failed,
+    }
+
+
+def fiber_summary(L, load_type, params, b, D, Ast, fck, fy, M_max, cover=50):
+    """Single-beam fiber results for /calculate: stress profile and cracked-section figures.
+
+    ``M_max`` (kN·m) is the service moment; other arguments as in
+    ``cracked_deflection``. Returns plain floats/bools, with None for
+    undefined values (no yield before crushing, moment beyond capacity).
+    """
+    profile = stress_profile(b, D, Ast, fck, fy, M_max, cover)
+    cracked = cracked_deflection(L, load_type, params, b, D, Ast, fck, fy, cover)
+    summary = {key: cracked[key] for key in ("max_deflection", "cracked_length", "M_cr", "M_y", "M_u", "failed")}
+    summary = {key: None if isinstance(value, float) and np.isnan(value) else value for key, value in summary.items()}
+    summary.update({key: profile[key] for key in ("neutral_axis", "steel_stress", "cracked")})
+    return {"stress_profile": profile, "cracked_section": summary}
@@ -23,6 +23,13 @@ loglevel = "info"
 # Process naming
 proc_name = "beam_calculator"
 
+# Server hooks
+def on_starting(server):
+    # Build/open the design lookup tables once in the master; forked workers
+    # inherit the same read-only memory maps
+    from design_tables import load_tables
+    load_tables()
+
 # Server mechanics
 daemon = False
 pidfile = None
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from pipeline import SessionStore, run_pipeline
+
+# Live slider mode
+#
+# Browsers POST their full slider state to /live/<client_id>/update and get
+# the recomputed chart delta in the response. Coalescing happens in the
+# browser: at most one update is in flight per client and later slider moves
+# are merged into the next request, so a burst costs one pipeline run for the
+# latest state. Requests never hold a worker thread beyond one computation.
+#
+# Nothing needs to survive between requests on the same process: the client
+# sends its complete inputs, the pipeline state id it was last given (used
+# for an incremental run when that state is still cached on this worker,
+# otherwise everything is recomputed) and short digests of the chart series
+# it already has, so only series whose digest changed are sent back.
+#
+# Live states are kept in their own store, separate from the /calculate_diff
+# sessions, and each (owner, client) keeps only its latest state: issuing a
+# new state id drops the previous one. Updates are rate limited per owner
+# (the signed-in user, else the remote address), which the caller cannot
+# change; the client id from the URL only tells one owner's tabs apart.
+
+LIVE_STAGES = ("profiles", "checks")
+CHART_KEYS = ("x_vals", "V_vals", "M_vals", "deflection_vals")
+RATIO_KEYS = ("stress", "stress_ok", "stress_ratio", "deflection", "deflection_ok", "deflection_ratio")
+
+MAX_UPDATES_PER_SECOND = float(os.getenv("LIVE_MAX_UPDATES_PER_SECOND", "30"))
+MAX_OWNERS = 1000     # rate-limit buckets kept
+MAX_CLIENTS = 1000    # live states kept, one per (owner, client)
+SIGNIFICANT_DIGITS = 5
+DIGEST_CHARS = 12
+
+
+class _Bucket:
+    def __init__(self):
+        self.tokens = MAX_UPDATES_PER_SECOND
+        self.time = time.monotonic()
+
+    def take(self):
+        """Token-bucket limit on incoming updates; False when over the rate."""
+        now = time.monotonic()
+        self.tokens = min(MAX_UPDATES_PER_SECOND, self.tokens + (now - self.time) * MAX_UPDATES_PER_SECOND)
+        self.time = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+# Rate limiting is per process (best effort); correctness does not depend on it
+_buckets = OrderedDict()
+_states = SessionStore(MAX_CLIENTS)
+_latest = OrderedDict()  # (owner, client_id) -> the state id last issued to it
+_lock = threading.Lock()
+_stats = {"updates": 0, "incremental": 0, "full": 0, "rate_limited": 0, "series_sent": 0, "series_skipped": 0}
+
+
+def _allow(owner):
+    with _lock:
+        bucket = _buckets.get(owner)
+        if bucket is None:
+            bucket = _buckets[owner] = _Bucket()
+            while len(_buckets) > MAX_OWNERS:
+                _buckets.popitem(last=False)
+        _buckets.move_to_end(owner)
+        allowed = bucket.take()
+        _stats["updates" if allowed else "rate_limited"] += 1
+    return allowed
+
+
+def _compact(values):
+    return [float(f"{v:.{SIGNIFICANT_DIGITS}g}") for v in values]
+
+
+def digest(value):
+    return hashlib.sha1(json.dumps(value).encode()).hexdigest()[:DIGEST_CHARS]
+
+
+def _replace_state(key, state_id):
+    """Record ``state_id`` as the latest for ``key`` and drop the state it replaces."""
+    with _lock:
+        previous = _latest.pop(key, None)
+        _latest[key] = state_id
+        evicted = [_latest.popitem(last=False)[1] for _ in range(len(_latest) - MAX_CLIENTS)]
+    for old in [previous] + evicted:
+        if old and old != state_id:
+            _states.discard(old)
+
+
+def compute_update(owner, client_id, inputs, state_id=None, digests=None):
+    """Recompute live charts for a client's complete ``inputs``.
+
+    ``owner`` is the server-side identity the rate limit applies to and
+    ``client_id`` one of its live views. Returns ``{"state_id", "delta",
+    "digests"}`` with only the values whose digest differs from ``digests``
+    (what the browser already shows), or None when the owner is over its
+    update rate.
+    """
+    if not _allow(owner):
+        return None
+    key = (owner, client_id)
+    digests = digests or {}
+    state, source = None, "full"
+    with _lock:
+        # Only the state issued to this owner and client can be continued
+        own_state = state_id is not None and _latest.get(key) == state_id
+    if own_state:
+        try:
+            # Full inputs on top of the cached state: only what moved is recomputed
+            state, source = run_pipeline(inputs, state_id, targets=LIVE_STAGES, store=_states), "incremental"
+        except KeyError:
+            # State was evicted
+            pass
+    if state is None:
+        state = run_pipeline(inputs, None, targets=LIVE_STAGES, store=_states)
+    _replace_state(key, state["state_id"])
+
+    outputs = state["outputs"]
+    current = {key: _compact(outputs["profiles"][key]) for key in CHART_KEYS}
+    current.update({key: outputs["checks"][key] for key in RATIO_KEYS})
+    current_digests = {key: digest(value) for key, value in current.items()}
+    delta = {key: value for key, value in current.items() if digests.get(key) != current_digests[key]}
+    with _lock:
+        _stats[source] += 1
+        _stats["series_sent"] += len(delta)
+        _stats["series_skipped"] += len(current) - len(delta)
+    return {"state_id": state["state_id"], "delta": delta, "digests": current_digests}
+
+
+def live_stats():
+    with _lock:
+        stats = dict(_stats)
+        stats["owners"] = len(_buckets)
+        stats["clients"] = len(_latest)
+    return stats
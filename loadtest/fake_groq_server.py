@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Fake Groq (OpenAI-compatible) chat-completions server.
+
+Answers POST /openai/v1/chat/completions with canned text, either as one
+JSON body or, with "stream": true, as server-sent chunks paced by a first-token
+delay and a per-token delay. Streams the client abandons are counted as
+cancelled, so upstream cancellation can be checked:
+
+    python -m loadtest.fake_groq_server --port 8089 --tokens 200 --token-delay 0.02
+    GROQ_API_KEY=fake GROQ_BASE_URL=http://127.0.0.1:8089 python app.py
+    curl http://127.0.0.1:8089/stats
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = ("The bending moment under a uniformly distributed load varies as a parabola "
+         "because shear varies linearly along the span. ").split()
+
+
+class FakeGroqServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, tokens=100, first_token_delay=0.3, token_delay=0.02):
+        super().__init__(address, FakeGroqHandler)
+        self.tokens = tokens
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "streams": 0, "completed": 0, "cancelled": 0, "tokens_sent": 0}
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.stats[key] += n
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with self.server.lock:
+                self._send_json(dict(self.server.stats))
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self._send_json({"error": "not found"}, 404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        self.server.count("requests")
+        model = body.get("model", "fake")
+        tokens = [WORDS[i % len(WORDS)] + " " for i in range(min(self.server.tokens, body.get("max_tokens") or 10 ** 9))]
+        if body.get("stream"):
+            self._stream(model, tokens)
+        else:
+            time.sleep(self.server.first_token_delay + self.server.token_delay * len(tokens))
+            self.server.count("completed")
+            self.server.count("tokens_sent", len(tokens))
+            self._send_json({
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens)},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+            })
+
+    def _stream(self, model, tokens):
+        self.server.count("streams")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        sent = 0
+        try:
+            time.sleep(self.server.first_token_delay)
+            for token in tokens:
+                self._chunk(model, {"content": token}, None)
+                sent += 1
+                time.sleep(self.server.token_delay)
+            self._chunk(model, {}, "stop")
+            self._write("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+            self.server.count("completed")
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.count("cancelled")
+            self.close_connection = True
+        finally:
+            self.server.count("tokens_sent", sent)
+
+    def _chunk(self, model, delta, finish_reason):
+        payload = {
+            "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        self._write(f"data: {json.dumps(payload)}\n\n")
+
+    def _write(self, text):
+        data = text.encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, payload, status=200):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start(port=0, **options):
+    """Run a server on a background thread and return it (``server.base_url``, ``server.stats``)."""
+    server = FakeGroqServer(("127.0.0.1", port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--tokens", type=int, default=100, help="tokens per answer")
+    parser.add_argument("--first-token-delay", type=float, default=0.3, help="seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between tokens")
+    args = parser.parse_args()
+    server = FakeGroqServer(("127.0.0.1", args.port), args.tokens, args.first_token_delay, args.token_delay)
+    print(f"🧪 Fake Groq server on {server.base_url} ({args.tokens} tokens, "
+          f"{args.first_token_delay}s to first token, {args.token_delay}s/token)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Load-test harness for the Beam Load Calculator.
+
+Starts the app under gunicorn (gunicorn_config.py plus the Procfile flags)
+with Groq/LangChain, Firebase and MongoDB replaced by local stand-ins, replays
+a weighted mix of /calculate, /chat, /verify_token and /get_projects traffic
+for each workers × threads configuration, and reports throughput and
+p50/p95/p99 latency per route.
+
+    python -m loadtest.run --configs 1x2,2x4 --duration 30 --concurrency 16
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import shlex
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MIX = "calculate=60,chat=20,verify_token=10,get_projects=10"
+LOAD_TYPES = ("point_center", "udl", "uvl", "moment")
+LOAD_FIELDS = {"point_center": "P", "udl": "w", "uvl": "w_max", "moment": "M_applied"}
+
+
+def procfile_options():
+    """gunicorn flags from the Procfile `web:` line (workers, threads, worker class, ...)."""
+    options = {}
+    for line in (ROOT / "Procfile").read_text().splitlines():
+        if line.startswith("web:"):
+            args = shlex.split(line[len("web:"):])
+            for i, arg in enumerate(args):
+                if arg.startswith("--") and i + 1 < len(args) and not args[i + 1].startswith("--"):
+                    options[arg] = args[i + 1]
+    options.pop("--bind", None)
+    return options
+
+
+def parse_configs(text):
+    configs = []
+    for item in text.split(","):
+        match = re.fullmatch(r"(\d+)x(\d+)", item.strip())
+        if not match:
+            raise ValueError(f"Bad config '{item}', expected WORKERSxTHREADS")
+        configs.append((int(match.group(1)), int(match.group(2))))
+    return configs
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(","):
+        route, weight = item.split("=")
+        mix[route.strip()] = float(weight)
+    return mix
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# 1. Requests
+def calculate_request(rng):
+    load_type = rng.choice(LOAD_TYPES)
+    form = {
+        "length": f"{rng.uniform(3, 9):.2f}",
+        "loadType": load_type,
+        LOAD_FIELDS[load_type]: f"{rng.uniform(5, 60):.1f}",
+        "buildingType": rng.choice(["residential", "office", "warehouse", "school"]),
+        "material": rng.choice(["M20", "M25"]),
+        "b": str(rng.choice([230, 300])),
+        "d": str(rng.choice([300, 400, 450, 500, 600])),
+        "limit_state": rng.choice(["collapse", "serviceability"]),
+    }
+    return "POST", "/calculate", urllib.parse.urlencode(form).encode(), "application/x-www-form-urlencoded"
+
+
+def chat_request(rng):
+    body = json.dumps({"message": rng.choice([
+        "Why is the moment diagram parabolic under UDL?",
+        "What is the deflection limit for a floor beam?",
+        "How do I choose between M20 and M25?",
+    ])}).encode()
+    return "POST", "/chat", body, "application/json"
+
+
+def chat_stream_request(rng):
+    return ("POST", "/chat/stream") + chat_request(rng)[2:]
+
+
+@lru_cache(maxsize=None)
+def _id_token(user):
+    # Signed with the key the stubbed app trusts, so /verify_token takes the real local path
+    return _issuer().issue(f"user-{user}")
+
+
+@lru_cache(maxsize=1)
+def _issuer():
+    from loadtest.stubs import LocalTokenIssuer
+    return LocalTokenIssuer()
+
+
+def verify_token_request(rng):
+    body = json.dumps({"idToken": _id_token(rng.randrange(1000))}).encode()
+    return "POST", "/verify_token", body, "application/json"
+
+
+def get_projects_request(rng):
+    return "GET", "/get_projects", None, None
+
+
+REQUESTS = {
+    "calculate": calculate_request,
+    "chat": chat_request,
+    "chat_stream": chat_stream_request,
+    "verify_token": verify_token_request,
+    "get_projects": get_projects_request,
+}
+
+
+def send(base_url, method, path, body, content_type, timeout):
+    req = urllib.request.Request(base_url + path, data=body, method=method)
+    if content_type:
+        req.add_header("Content-Type", content_type)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            response.read()
+            ok = response.status < 500
+    except urllib.error.HTTPError as e:
+        ok = e.code < 500
+    except Exception:
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+# 2. Server
+def start_server(workers, threads, port, env):
+    options = procfile_options()
+    options["--workers"] = str(workers)
+    options["--threads"] = str(threads)
+    cmd = [sys.executable, "-m", "gunicorn", "-c", str(ROOT / "gunicorn_config.py")]
+    for flag, value in options.items():
+        cmd += [flag, value]
+    cmd += ["--bind", f"127.0.0.1:{port}", "--access-logfile", "/dev/null", "loadtest.stubbed_app:app"]
+    process = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1):
+                return process
+        except Exception:
+            if process.poll() is not None:
+                raise RuntimeError("gunicorn exited during startup")
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("gunicorn did not become ready")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+# 3. Load
+def run_load(base_url, mix, duration, concurrency, timeout, seed):
+    routes = list(mix)
+    weights = [mix[r] for r in routes]
+    samples = {route: [] for route in routes}
+    errors = {route: 0 for route in routes}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def user(index):
+        rng = random.Random(seed + index)
+        while time.monotonic() < deadline:
+            route = rng.choices(routes, weights)[0]
+            elapsed, ok = send(base_url, *REQUESTS[route](rng), timeout)
+            with lock:
+                samples[route].append(elapsed)
+                errors[route] += not ok
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(user, range(concurrency)))
+    wall = time.monotonic() - start
+    return samples, errors, wall
+
+
+def summarize(samples, errors, wall):
+    report = {}
+    everything = []
+    for route, values in samples.items():
+        everything += values
+        report[route] = _stats(values, errors[route], wall)
+    report["all"] = _stats(everything, sum(errors.values()), wall)
+    return report
+
+
+def _stats(values, error_count, wall):
+    if not values:
+        return {"requests": 0, "errors": error_count, "throughput": 0.0, "p50_ms": None, "p95_ms": None, "p99_ms": None}
+    p50, p95, p99 = np.percentile(np.asarray(values) * 1000, [50, 95, 99])
+    return {
+        "requests": len(values),
+        "errors": error_count,
+        "throughput": len(values) / wall,
+        "p50_ms": round(float(p50), 1),
+        "p95_ms": round(float(p95), 1),
+        "p99_ms": round(float(p99), 1),
+    }
+
+
+def print_report(results):
+    print(f"\n{'config':<10}{'route':<15}{'req':>7}{'err':>6}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for config, report in results.items():
+        for route, stats in report.items():
+            fmt = lambda v: "-" if v is None else f"{v:.1f}"
+            print(f"{config:<10}{route:<15}{stats['requests']:>7}{stats['errors']:>6}{stats['throughput']:>9.1f}"
+                  f"{fmt(stats['p50_ms']):>10}{fmt(stats['p95_ms']):>10}{fmt(stats['p99_ms']):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--configs", default=None, help="WORKERSxTHREADS list, default: the Procfile setting")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"route weights (default {DEFAULT_MIX})")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load per config")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent virtual users")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="stub Groq/LangChain latency (s)")
+    parser.add_argument("--auth-latency", type=float, default=0.05, help="stub Firebase latency (s)")
+    parser.add_argument("--mongo-latency", type=float, default=0.005, help="stub MongoDB latency (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    if args.configs is None:
+        options = procfile_options()
+        args.configs = f"{options.get('--workers', 1)}x{options.get('--threads', 1)}"
+    mix = parse_mix(args.mix)
+    env = dict(
+        os.environ,
+        LOADTEST_LLM_LATENCY=str(args.llm_latency),
+        LOADTEST_AUTH_LATENCY=str(args.auth_latency),
+        LOADTEST_MONGO_LATENCY=str(args.mongo_latency),
+        GROQ_API_KEY="",
+        MONGO_URI="",
+        FIREBASE_CREDENTIALS="",
+        PYTHONPATH=str(ROOT),
+    )
+
+    results = {}
+    for workers, threads in parse_configs(args.configs):
+        config = f"{workers}x{threads}"
+        port = free_port()
+        print(f"🚀 {config}: {workers} worker(s) × {threads} thread(s), {args.concurrency} users, {args.duration}s")
+        process = start_server(workers, threads, port, env)
+        try:
+            samples, errors, wall = run_load(f"http://127.0.0.1:{port}", mix, args.duration,
+                                             args.concurrency, args.timeout, args.seed)
+        finally:
+            stop_server(process)
+        results[config] = summarize(samples, errors, wall)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+# Gunicorn entry point for load tests: `gunicorn loadtest.stubbed_app:app`
+import app as beam_app
+from loadtest import stubs
+
+stubs.install(beam_app)
+app = beam_app.app
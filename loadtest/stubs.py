@@ -0,0 +1,169 @@
+import copy
+import datetime
+import hashlib
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt
+
+from token_cache import ISSUER_PREFIX, TokenVerifier
+
+# Local stand-ins for Groq/LangChain, Firebase and MongoDB
+#
+# Each stand-in sleeps for a configurable latency (seconds, from the
+# environment) to mimic the remote service, so the app can be load-tested
+# without network access or credentials.
+
+LLM_LATENCY = float(os.getenv("LOADTEST_LLM_LATENCY", "1.0"))
+AUTH_LATENCY = float(os.getenv("LOADTEST_AUTH_LATENCY", "0.05"))
+MONGO_LATENCY = float(os.getenv("LOADTEST_MONGO_LATENCY", "0.005"))
+# Shared by the load generator (signs tokens) and the stubbed app (verifies them)
+TOKEN_KEY_FILE = os.getenv("LOADTEST_TOKEN_KEY", os.path.join(tempfile.gettempdir(), "beam_loadtest_token_key.pem"))
+PROJECT_ID = "beam-loadtest"
+
+
+def fake_langchain_suggestions(building_type, length, load_type, load_value):
+    time.sleep(LLM_LATENCY)
+    return f"1. 🔄 Stub suggestion for a {length} m {load_type} beam ({building_type})."
+
+
+def fake_langchain_error_explanation(**kwargs):
+    time.sleep(LLM_LATENCY)
+    return "1️⃣ Stub explanation of the failed check."
+
+
+def fake_chatbot_response(user_query):
+    time.sleep(LLM_LATENCY)
+    return f"Stub answer to: {user_query}"
+
+
+def fake_stream_llm_tokens(user_query, tokens=20):
+    for i in range(tokens):
+        time.sleep(LLM_LATENCY / tokens)
+        yield {"type": "token", "text": f"stub{i} "}
+
+
+class FakeAuth:
+    @staticmethod
+    def verify_id_token(id_token):
+        time.sleep(AUTH_LATENCY)
+        uid = hashlib.sha256(id_token.encode()).hexdigest()[:16]
+        return {"uid": uid, "email": f"{uid}@example.com"}
+
+
+class LocalTokenIssuer:
+    """Signs Firebase-shaped ID tokens with a local RSA key, so tokens verify without network access."""
+
+    key_id = "loadtest-key"
+
+    def __init__(self, key_file=TOKEN_KEY_FILE, project_id=PROJECT_ID):
+        self.project_id = project_id
+        if not os.path.exists(key_file):
+            key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+            pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                    serialization.NoEncryption())
+            tmp = f"{key_file}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(pem)
+            os.replace(tmp, key_file)
+        with open(key_file, "rb") as f:
+            pem = f.read()
+        self.signer = crypt.RSASigner.from_string(pem, key_id=self.key_id)
+        key = serialization.load_pem_private_key(pem, password=None)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken.loadtest")])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+                .serial_number(1).not_valid_before(now - datetime.timedelta(days=1))
+                .not_valid_after(now + datetime.timedelta(days=1)).sign(key, hashes.SHA256()))
+        self.cert = cert.public_bytes(serialization.Encoding.PEM).decode()
+
+    def keys(self):
+        """Drop-in for token_cache.fetch_google_certs."""
+        return {self.key_id: self.cert}, 3600
+
+    def issue(self, uid, lifetime=3600, key_id=None, **claims):
+        """A signed token for ``uid``; ``claims`` override the standard ones (for negative tests)."""
+        now = int(time.time())
+        return jwt.encode(self.signer, {
+            "iss": ISSUER_PREFIX + self.project_id, "aud": self.project_id, "sub": uid, "user_id": uid,
+            "email": f"{uid}@example.com", "iat": now, "auth_time": now, "exp": now + lifetime,
+            **claims,
+        }, key_id=key_id).decode()
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = []
+
+    def insert_one(self, doc):
+        time.sleep(MONGO_LATENCY)
+        self.docs.append(copy.deepcopy(doc))
+
+    def update_one(self, query, update, upsert=False):
+        time.sleep(MONGO_LATENCY)
+        if upsert and not any(doc.get("_id") == query.get("_id") for doc in self.docs):
+            self.docs.append({**query, **copy.deepcopy(update.get("$setOnInsert", {}))})
+            return SimpleNamespace(upserted_id=query.get("_id"))
+        return SimpleNamespace(upserted_id=None)
+
+    def find(self, query=None, projection=None):
+        time.sleep(MONGO_LATENCY)
+        hidden = [k for k, v in (projection or {}).items() if not v]
+        return [{k: v for k, v in doc.items() if k not in hidden} for doc in self.docs[-100:]]
+
+    def find_one(self, query):
+        time.sleep(MONGO_LATENCY)
+        return next((copy.deepcopy(doc) for doc in self.docs if doc.get("_id") == query.get("_id")), None)
+
+    def aggregate(self, pipeline):
+        # Pipelines are not evaluated; the latency and a bounded result are what the load test needs
+        time.sleep(MONGO_LATENCY)
+        return copy.deepcopy(self.docs[-100:])
+
+    def bulk_write(self, requests, ordered=True):
+        time.sleep(MONGO_LATENCY)
+
+
+class FakeDatabase:
+    def __init__(self):
+        self._collections = {}
+
+    def __getitem__(self, name):
+        return self._collections.setdefault(name, FakeCollection())
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+
+class FakeMongo:
+    def __init__(self):
+        self.db = FakeDatabase()
+
+
+def install(app_module):
+    """Swap the external services used by ``app_module`` (and its helpers) for the stand-ins."""
+    import chatbot
+    import pipeline
+
+    app_module.langchain_suggestions = fake_langchain_suggestions
+    app_module.langchain_error_explanation = fake_langchain_error_explanation
+    chatbot.llm_chatbot_response = fake_chatbot_response
+    chatbot.stream_llm_tokens = fake_stream_llm_tokens
+    pipeline.langchain_suggestions = fake_langchain_suggestions
+    pipeline.langchain_error_explanation = fake_langchain_error_explanation
+    app_module.auth = FakeAuth()
+    app_module.firebase_initialized = True
+    app_module.token_verifier = TokenVerifier(
+        PROJECT_ID, fetch_keys=LocalTokenIssuer().keys, fallback=FakeAuth.verify_id_token
+    )
+    app_module.token_verifier.start()
+    app_module.mongo = FakeMongo()
+    print(f"🧪 Stubs installed (LLM {LLM_LATENCY}s, auth {AUTH_LATENCY}s, Mongo {MONGO_LATENCY}s)")
@@ -0,0 +1,383 @@
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from beam_logic import (
+    calculate_all,
+    profile_at,
+    get_material_properties,
+    rectangular_section,
+    stress_check,
+    calculate_loads,
+    factored_loads,
+)
+from reinforcement import design_summary
+from fiber_section import fiber_summary
+from cost_engine import beam_costs
+from design_rules import check_arrays, summarize, allowable_stress, deflection_limit as permissible_deflection
+from suggestions import (
+    suggest_fix_for_stress_warning,
+    suggest_fix_for_deflection_warning,
+    langchain_suggestions,
+    langchain_error_explanation,
+)
+
+# Incremental /calculate pipeline
+#
+# inputs -> section -> loads -> profiles -> checks -> reinforcement -> fiber / cost -> advice
+#
+# Every stage declares the raw inputs and upstream stages it reads. When a
+# what-if edit arrives as a diff against a stored session state, only the
+# stages downstream of the changed inputs are recomputed; everything else is
+# reused from the cached state.
+
+INPUT_DEFAULTS = {
+    "length": 0.0,
+    "loadType": "",
+    "b": 0.0,
+    "d": 0.0,
+    "material": "M20",
+    "P": 0.0,
+    "a": 0.0,
+    "w": 0.0,
+    "w_max": 0.0,
+    "M_applied": 0.0,
+    "limit_state": "collapse",
+    "buildingType": "residential",
+}
+TEXT_INPUTS = ("loadType", "material", "limit_state", "buildingType")
+LOAD_KEYS = ("P", "a", "w", "w_max", "M_applied")
+
+MAX_SESSIONS = 256
+AI_TIMEOUT = 5  # seconds, same budget as /calculate
+
+
+
+def _to_float(value, default=0.0):
+    try:
+        if isinstance(value, list):
+            value = value[0]
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def normalize_inputs(raw):
+    """Coerce form-style values (strings, lists) into typed pipeline inputs."""
+    inputs = {}
+    for key, value in raw.items():
+        if key not in INPUT_DEFAULTS:
+            continue
+        if key in TEXT_INPUTS:
+            inputs[key] = value[0] if isinstance(value, list) else str(value)
+        else:
+            inputs[key] = _to_float(value)
+    return inputs
+
+
+def _call_with_timeout(fn, timeout, *args, **kwargs):
+    result = [None]
+
+    def target():
+        try:
+            result[0] = fn(*args, **kwargs)
+        except Exception:
+            pass
+
+    thread = threading.Thread(target=target)
+    thread.daemon = True
+    thread.start()
+    thread.join(timeout=timeout)
+    return result[0] if result[0] else ""
+
+
+def load_value(inputs):
+    """Governing load value (N or N·m) for the selected load type."""
+    load_type = inputs["loadType"]
+    if load_type == "udl":
+        return inputs["w"] * 1000
+    elif load_type in ["point_center", "point_anywhere"]:
+        return inputs["P"] * 1000
+    elif load_type == "uvl":
+        return inputs["w_max"] * 1000
+    elif load_type == "moment":
+        return inputs["M_applied"] * 1000
+    return 0.0
+
+
+# 1. Stages
+def _stage_section(inputs, out):
+    return rectangular_section(inputs["b"] / 1000, inputs["d"] / 1000)
+
+
+def _stage_material(inputs, out):
+    return get_material_properties(inputs["material"])
+
+
+def _stage_loads(inputs, out):
+    dl, il, wl = calculate_loads(
+        inputs["length"], inputs["b"] / 1000, inputs["d"] / 1000,
+        inputs["P"], inputs["w"], inputs["w_max"], inputs["M_applied"]
+    )
+    return {
+        "dl": dl,
+        "il": il,
+        "wl": wl,
+        "results": factored_loads(inputs["limit_state"], dl, il, wl),
+    }
+
+
+def load_params(inputs):
+    """Load parameters in N, N/m and N·m as ``calculate_all`` expects them."""
+    return {
+        "P": inputs["P"] * 1000,
+        "a": inputs["a"],
+        "w": inputs["w"] * 1000,
+        "w_max": inputs["w_max"] * 1000,
+        "M_applied": inputs["M_applied"] * 1000,
+    }
+
+
+POINT_ANYWHERE_STATIONS = 100
+
+
+def _point_anywhere_profiles(L, params, E, I):
+    # beam_logic.point_load_anywhere returns its values in N and in a different
+    # order from the other load cases; build the same series from profile_at
+    P, a = params["P"], params["a"]
+    x = np.linspace(0, L, POINT_ANYWHERE_STATIONS)
+    V, M, delta = profile_at(x, L, "point_anywhere", params, E, I)
+    return (P * (L - a) / L / 1000, P * a / L / 1000, float(np.abs(M).max()), x.tolist(),
+            V.tolist(), M.tolist(), delta.tolist(), float(np.abs(delta).max()))
+
+
+def _stage_profiles(inputs, out):
+    params = load_params(inputs)
+    E, I = out["material"].get("E", 25e9), out["section"]["I"]
+    if inputs["loadType"] == "point_anywhere":
+        profiles = _point_anywhere_profiles(inputs["length"], params, E, I)
+    else:
+        profiles = calculate_all(inputs["length"], inputs["loadType"], params, E=E, I=I)
+    R1, R2, M_max, x_vals, V_vals, M_vals, deflection_vals, max_deflection = profiles
+    return {
+        "R1": float(R1),
+        "R2": float(R2),
+        "M_max": float(M_max),
+        "x_vals": x_vals,
+        "V_vals": V_vals,
+        "M_vals": M_vals,
+        "deflection_vals": [float(v) for v in deflection_vals],
+        "max_deflection": float(max_deflection),
+    }
+
+
+def _stage_checks(inputs, out):
+    material = out["material"]
+    fck = material.get("fck", 0)
+    stress, stress_ok = stress_check(out["profiles"]["M_max"] * 1e6, out["section"]["Z"] * 1e9, fck)
+    stress = round(stress, 2)
+    deflection = out["profiles"]["max_deflection"]
+    deflection_limit = permissible_deflection(inputs["length"])
+    deflection_ok = deflection <= deflection_limit
+
+    checks = {
+        "stress": stress,
+        "stress_ok": bool(stress_ok),
+        "stress_ratio": round(stress / material.get("fck", 1), 2),
+        "stress_warning": "",
+        "deflection": round(deflection, 2),
+        "deflection_limit": deflection_limit,
+        "deflection_ok": bool(deflection_ok),
+        "deflection_ratio": round(deflection / deflection_limit, 2) if deflection_limit else 0.0,
+        "deflection_warning": "",
+        "code_checks": summarize(check_arrays(
+            inputs["length"], inputs["b"], inputs["d"], allowable_stress(inputs["material"]),
+            out["profiles"]["M_max"], deflection
+        )),
+    }
+    if not stress_ok:
+        checks["stress_warning"] = f"⚠️ Warning: Stress {stress} MPa exceeds allowable limit of {fck} MPa!"
+        checks["stress_fix"] = suggest_fix_for_stress_warning(stress, inputs["material"])
+    else:
+        checks["stress_fix"] = "✅ Stress is within acceptable limits."
+    if not deflection_ok:
+        checks["deflection_warning"] = (
+            f"⚠️ Warning: Deflection {round(deflection, 2)} mm exceeds limit of {round(deflection_limit, 2)} mm."
+        )
+        checks["deflection_fix"] = suggest_fix_for_deflection_warning(deflection, deflection_limit)
+    else:
+        checks["deflection_fix"] = "✅ Deflection is within acceptable limits."
+    return checks
+
+
+def _stage_reinforcement(inputs, out):
+    profiles = out["profiles"]
+    return design_summary(
+        inputs["b"], inputs["d"], inputs["length"], profiles["M_max"],
+        max(abs(v) for v in profiles["V_vals"]), inputs["material"]
+    )
+
+
+def _stage_fiber(inputs, out):
+    reinforcement = out["reinforcement"]
+    return fiber_summary(
+        inputs["length"], inputs["loadType"], load_params(inputs), inputs["b"], inputs["d"],
+        reinforcement["Ast"], reinforcement["fck"], reinforcement["fy"], out["profiles"]["M_max"]
+    )
+
+
+def _stage_cost(inputs, out):
+    cost = beam_costs(inputs["b"], inputs["d"], inputs["length"], out["reinforcement"]["steel_weight"])
+    return {key: value.item() for key, value in cost.items()}
+
+
+def _stage_advice(inputs, out):
+    checks = out["checks"]
+    ai_error_explanation = ""
+    if not checks["stress_ok"] or not checks["deflection_ok"]:
+        ai_error_explanation = _call_with_timeout(
+            langchain_error_explanation, AI_TIMEOUT,
+            length=inputs["length"],
+            b=inputs["b"] / 1000,
+            d=inputs["d"] / 1000,
+            material=inputs["material"],
+            stress=checks["stress"],
+            stress_ok=checks["stress_ok"],
+            deflection=checks["deflection"],
+            deflection_ok=checks["deflection_ok"],
+            load_type=inputs["loadType"],
+        )
+    ai_response = _call_with_timeout(
+        langchain_suggestions, AI_TIMEOUT,
+        inputs["buildingType"], inputs["length"], inputs["loadType"], load_value(inputs)
+    )
+    return {"ai_error_explanation": ai_error_explanation, "ai_response": ai_response}
+
+
+# 2. Dependency graph: (stage, input keys, upstream stages, function), in topological order
+STAGES = [
+    ("section", ("b", "d"), (), _stage_section),
+    ("material", ("material",), (), _stage_material),
+    ("loads", ("length", "b", "d", "P", "w", "w_max", "M_applied", "limit_state"), (), _stage_loads),
+    ("profiles", ("length", "loadType") + LOAD_KEYS, ("section", "material"), _stage_profiles),
+    ("checks", ("length", "b", "d", "material"), ("section", "material", "profiles"), _stage_checks),
+    ("reinforcement", ("length", "b", "d", "material"), ("profiles",), _stage_reinforcement),
+    ("fiber", ("length", "b", "d", "loadType") + LOAD_KEYS, ("profiles", "reinforcement"), _stage_fiber),
+    ("cost", ("length", "b", "d"), ("reinforcement",), _stage_cost),
+    ("advice", ("length", "b", "d", "material", "loadType", "buildingType") + LOAD_KEYS, ("checks",), _stage_advice),
+]
+
+
+def dirty_stages(changed_keys, stale=()):
+    """Stages that must recompute when ``changed_keys`` change.
+
+    ``stale`` lists stages that were skipped on an earlier partial run and
+    are therefore still out of date.
+    """
+    changed_keys = set(changed_keys)
+    dirty = []
+    for name, input_keys, upstream, _ in STAGES:
+        if (name in stale or changed_keys.intersection(input_keys)
+                or any(dep in dirty for dep in upstream)):
+            dirty.append(name)
+    return dirty
+
+
+def required_stages(targets):
+    """``targets`` plus every stage they transitively depend on."""
+    upstream_of = {name: upstream for name, _, upstream, _ in STAGES}
+    required = set()
+    todo = list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in required:
+            required.add(name)
+            todo.extend(upstream_of[name])
+    return required
+
+
+# 3. Session states
+class SessionStore:
+    """Bounded LRU of pipeline states by state id, safe to share between threads."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, state):
+        state_id = uuid.uuid4().hex
+        with self._lock:
+            self._states[state_id] = state
+            while len(self._states) > self.max_size:
+                self._states.popitem(last=False)
+        return state_id
+
+    def get(self, state_id):
+        """The stored state; raises KeyError for unknown or evicted ids."""
+        with self._lock:
+            state = self._states[state_id]
+            self._states.move_to_end(state_id)
+        return state
+
+    def discard(self, state_id):
+        with self._lock:
+            self._states.pop(state_id, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._states)
+
+
+# /calculate_diff sessions; other callers (live mode) pass their own store
+_sessions = SessionStore(MAX_SESSIONS)
+
+
+def run_pipeline(changes, state_id=None, targets=None, store=None):
+    """Apply ``changes`` on top of a stored state and recompute what they affect.
+
+    Without ``state_id`` the changes are taken as a complete input set and
+    every stage runs. ``targets`` restricts the run to the named stages and
+    their upstream dependencies; other dirty stages are left stale and are
+    picked up by the next run that needs them. Raises ``KeyError`` for unknown
+    or evicted state ids. States are kept in ``store`` (the /calculate_diff
+    sessions by default). Returns the new state id, the recomputed and stale
+    stage names and all stage outputs.
+    """
+    store = _sessions if store is None else store
+    changes = normalize_inputs(changes)
+    if state_id:
+        previous = store.get(state_id)
+        inputs = dict(previous["inputs"])
+        outputs = dict(previous["outputs"])
+        stale = previous["stale"]
+        changed = [k for k, v in changes.items() if inputs.get(k) != v]
+    else:
+        inputs = dict(INPUT_DEFAULTS)
+        outputs = {}
+        stale = ()
+        changed = list(INPUT_DEFAULTS)
+    inputs.update(changes)
+
+    dirty = dirty_stages(changed, stale)
+    if targets is not None:
+        required = required_stages(targets)
+        recomputed = [name for name in dirty if name in required]
+    else:
+        recomputed = dirty
+    for name, _, _, fn in STAGES:
+        if name in recomputed:
+            outputs[name] = fn(inputs, outputs)
+    stale = [name for name in dirty if name not in recomputed]
+
+    new_state_id = store.put({"inputs": inputs, "outputs": outputs, "stale": stale})
+    return {
+        "state_id": new_state_id,
+        "changed": changed,
+        "recomputed": recomputed,
+        "stale": stale,
+        "inputs": inputs,
+        "outputs": outputs,
+    }
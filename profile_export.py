@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+import numpy as np
+
+from beam_logic import profile_at
+
+# High-resolution profile export
+#
+# Profiles with 10^5-10^6 stations are generated chunk by chunk and written
+# straight into a memory-mapped .npy file (columns: x, V, M, deflection), so
+# peak memory is bounded by the chunk size rather than the station count.
+# Files are content-addressed by their inputs and reused across requests and
+# workers; the web response only carries a decimated view. The cache is kept
+# under PROFILE_CACHE_MAX_BYTES by deleting the least recently used files
+# (reuse refreshes a file's mtime) after each write.
+
+PROFILE_CACHE_DIR = os.getenv("PROFILE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "beam_profiles"))
+PROFILE_CACHE_MAX_BYTES = int(os.getenv("PROFILE_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+CHUNK_SIZE = 65536
+MAX_STATIONS = 5_000_000
+COLUMNS = ("x", "V", "M", "deflection")
+DTYPES = {"float32": np.float32, "float64": np.float64}
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def iter_profile_chunks(L, load_type, params, E, I, n_stations, chunk_size=CHUNK_SIZE, dtype=np.float64):
+    """Yield ``(start, block)`` with ``block`` of shape (n, 4) for consecutive station ranges."""
+    step = L / (n_stations - 1) if n_stations > 1 else 0.0
+    for start in range(0, n_stations, chunk_size):
+        x = np.arange(start, min(start + chunk_size, n_stations)) * step
+        V, M, delta = profile_at(x, L, load_type, params, E, I)
+        block = np.empty((len(x), len(COLUMNS)), dtype=dtype)
+        block[:, 0] = x
+        block[:, 1] = V
+        block[:, 2] = M
+        block[:, 3] = delta
+        yield start, block
+
+
+def profile_key(L, load_type, params, E, I, n_stations, dtype_name):
+    payload = json.dumps(
+        [L, load_type, sorted(params.items()), E, I, n_stations, dtype_name],
+        sort_keys=True, default=float
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def profile_path(key):
+    if not _KEY_PATTERN.match(key):
+        raise ValueError("Invalid profile key")
+    return os.path.join(PROFILE_CACHE_DIR, f"{key}.npy")
+
+
+def _summary_path(path):
+    return path[:-len(".npy")] + ".json"
+
+
+def write_profile(path, L, load_type, params, E, I, n_stations, dtype=np.float64, chunk_size=CHUNK_SIZE):
+    """Write the full-resolution profile into ``path`` and return its summary.
+
+    The file is written under a temporary name and renamed into place, so
+    concurrent readers never see a partial file. The summary is written
+    last: once it exists the profile is complete.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".npy.tmp")
+    os.close(fd)
+    summary = {"max_abs_V": 0.0, "max_abs_M": 0.0, "max_deflection": 0.0,
+               "index_max_M": 0, "index_max_deflection": 0}
+    try:
+        out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=(n_stations, len(COLUMNS)))
+        for start, block in iter_profile_chunks(L, load_type, params, E, I, n_stations, chunk_size, dtype):
+            out[start:start + len(block)] = block
+            summary["max_abs_V"] = max(summary["max_abs_V"], float(np.abs(block[:, 1]).max()))
+            i = int(np.abs(block[:, 2]).argmax())
+            if abs(block[i, 2]) > summary["max_abs_M"]:
+                summary["max_abs_M"] = float(abs(block[i, 2]))
+                summary["index_max_M"] = start + i
+            i = int(np.abs(block[:, 3]).argmax())
+            if abs(block[i, 3]) > summary["max_deflection"]:
+                summary["max_deflection"] = float(abs(block[i, 3]))
+                summary["index_max_deflection"] = start + i
+        out.flush()
+        del out
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    fd, tmp_summary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".json.tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(summary, f)
+    os.replace(tmp_summary, _summary_path(path))
+    return summary
+
+
+def evict_profiles(max_bytes=PROFILE_CACHE_MAX_BYTES, keep=None):
+    """Delete least recently used profiles until the cache fits in ``max_bytes``; returns the count removed."""
+    entries = []
+    try:
+        with os.scandir(PROFILE_CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".npy") and _KEY_PATTERN.match(entry.name[:-len(".npy")]):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except FileNotFoundError:
+        return 0
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        # Summary first, so a summary on disk always has its profile
+        for stale in (_summary_path(path), path):
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                # Already evicted by another worker
+                pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def get_or_create_profile(L, load_type, params, E, I, n_stations, dtype_name="float64"):
+    """Return ``(key, summary, created)``, writing the profile only if it is not cached."""
+    if dtype_name not in DTYPES:
+        raise ValueError(f"Unsupported dtype '{dtype_name}'")
+    if not 2 <= n_stations <= MAX_STATIONS:
+        raise ValueError(f"n_stations must be between 2 and {MAX_STATIONS}")
+    size = n_stations * len(COLUMNS) * np.dtype(DTYPES[dtype_name]).itemsize
+    if size > PROFILE_CACHE_MAX_BYTES:
+        raise ValueError(f"Profile of {size} bytes exceeds the {PROFILE_CACHE_MAX_BYTES}-byte cache")
+    key = profile_key(L, load_type, params, E, I, n_stations, dtype_name)
+    path = profile_path(key)
+    try:
+        with open(_summary_path(path)) as f:
+            summary = json.load(f)
+        os.utime(path)  # mark as recently used
+        return key, summary, False
+    except FileNotFoundError:
+        # Not cached (no summary yet), or evicted just now
+        pass
+    summary = write_profile(path, L, load_type, params, E, I, n_stations, DTYPES[dtype_name])
+    evict_profiles(keep=path)
+    return key, summary, True
+
+
+def decimated_view(key, max_points=1000):
+    """Evenly spaced stations plus the peak-moment and peak-deflection stations.
+
+    Reads only the selected rows from the memory-mapped file.
+    """
+    path = profile_path(key)
+    data = np.load(path, mmap_mode="r")
+    with open(_summary_path(path)) as f:
+        summary = json.load(f)
+    n = len(data)
+    index = np.linspace(0, n - 1, min(max_points, n)).astype(np.int64)
+    index = np.union1d(index, [summary["index_max_M"], summary["index_max_deflection"]])
+    rows = np.asarray(data[index], dtype=np.float64)
+    return {
+        "x_vals": rows[:, 0].tolist(),
+        "V_vals": rows[:, 1].tolist(),
+        "M_vals": rows[:, 2].tolist(),
+        "deflection_vals": rows[:, 3].tolist(),
+    }
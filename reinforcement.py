@@ -0,0 +1,166 @@
+import numpy as np
+
+from beam_logic import get_material_properties
+
+# Reinforcement design to IS 456:2000 (limit state of collapse)
+#
+# Every function works element-wise on numpy arrays so a whole batch of
+# beams is designed in one call. Units: mm, N/mm² (MPa), kN, kN·m.
+
+ES = 2e5           # Modulus of elasticity of steel (MPa)
+STEEL_DENSITY = 7850  # kg/m³
+GAMMA_F = 1.5      # Partial safety factor for loads
+
+# Table 19: design shear strength of concrete τc (MPa) against 100·As/(b·d)
+TAU_C_PT = np.array([0.15, 0.25, 0.50, 0.75, 1.00, 1.25, 1.50, 1.75, 2.00, 2.25, 2.50, 2.75, 3.00])
+TAU_C_FCK = np.array([15, 20, 25, 30, 35, 40])
+TAU_C_TABLE = np.array([
+    [0.28, 0.35, 0.46, 0.54, 0.60, 0.64, 0.68, 0.71, 0.71, 0.71, 0.71, 0.71, 0.71],
+    [0.28, 0.36, 0.48, 0.56, 0.62, 0.67, 0.72, 0.75, 0.79, 0.81, 0.82, 0.82, 0.82],
+    [0.29, 0.36, 0.49, 0.57, 0.64, 0.70, 0.74, 0.78, 0.82, 0.85, 0.88, 0.90, 0.92],
+    [0.29, 0.37, 0.50, 0.59, 0.66, 0.71, 0.76, 0.80, 0.84, 0.88, 0.91, 0.94, 0.96],
+    [0.29, 0.37, 0.50, 0.59, 0.67, 0.73, 0.78, 0.82, 0.86, 0.90, 0.93, 0.96, 0.99],
+    [0.30, 0.38, 0.51, 0.60, 0.68, 0.74, 0.79, 0.84, 0.88, 0.92, 0.95, 0.98, 1.01],
+])
+# Table 20: maximum shear stress τc,max (MPa)
+TAU_C_MAX = np.array([2.5, 2.8, 3.1, 3.5, 3.7, 4.0])
+
+DEFAULT_FCK = 20
+DEFAULT_FY = 415
+
+
+def design_grades(material_key):
+    """(fck, fy) for the app's single material selection.
+
+    A concrete grade keeps the default Fe415 bars; a steel grade is
+    designed with the default M20 concrete.
+    """
+    props = get_material_properties(material_key)
+    return props.get("fck", DEFAULT_FCK), props.get("fy", DEFAULT_FY)
+
+
+def xu_max_ratio(fy):
+    """Limiting neutral-axis depth ratio xu,max/d (cl. 38.1)."""
+    return 0.0035 / (0.0055 + 0.87 * np.asarray(fy, dtype=float) / ES)
+
+
+def _interp_index(grid, values):
+    values = np.clip(values, grid[0], grid[-1])
+    i = np.clip(np.searchsorted(grid, values, side="right") - 1, 0, len(grid) - 2)
+    t = (values - grid[i]) / (grid[i + 1] - grid[i])
+    return i, t
+
+
+def tau_c(pt, fck):
+    """τc from Table 19, bilinear in (fck, pt); values outside the table are clamped."""
+    pt = np.asarray(pt, dtype=float)
+    fck = np.asarray(fck, dtype=float)
+    i, s = _interp_index(TAU_C_FCK, fck)
+    j, t = _interp_index(TAU_C_PT, pt)
+    low = TAU_C_TABLE[i, j] * (1 - t) + TAU_C_TABLE[i, j + 1] * t
+    high = TAU_C_TABLE[i + 1, j] * (1 - t) + TAU_C_TABLE[i + 1, j + 1] * t
+    return low * (1 - s) + high * s
+
+
+def tau_c_max(fck):
+    return np.interp(fck, TAU_C_FCK, TAU_C_MAX)
+
+
+def limiting_moment(b, d, fck, fy):
+    """Mu,lim (kN·m) of a singly reinforced section."""
+    xu_max = xu_max_ratio(fy) * d
+    return 0.36 * fck * b * xu_max * (d - 0.42 * xu_max) / 1e6
+
+
+def design_beams(b, D, Mu, Vu, fck=DEFAULT_FCK, fy=DEFAULT_FY, cover=50,
+                 stirrup_dia=8, stirrup_legs=2, fy_stirrup=415):
+    """Flexure and shear design of a batch of rectangular beams.
+
+    ``b``, ``D`` overall section (mm); ``Mu`` (kN·m) and ``Vu`` (kN) are
+    factored design actions; ``cover`` is the effective cover to the tension
+    steel centroid. Returns a dict of arrays.
+    """
+    b, D, Mu, Vu, fck, fy = np.broadcast_arrays(*(np.asarray(v, dtype=float)
+                                                  for v in (b, D, Mu, Vu, fck, fy)))
+    Mu = np.abs(Mu)
+    Vu = np.abs(Vu)
+    d = D - cover
+
+    # Flexure (Annex G-1.1 b)
+    Mu_lim = limiting_moment(b, d, fck, fy)
+    over_reinforced = Mu > Mu_lim
+    Mu_design = np.minimum(Mu, Mu_lim)
+    root = np.sqrt(np.maximum(1 - 4.6 * Mu_design * 1e6 / (fck * b * d ** 2), 0))
+    Ast_req = 0.5 * fck / fy * (1 - root) * b * d
+    Ast_min = 0.85 * b * d / fy   # cl. 26.5.1.1 (a)
+    Ast_max = 0.04 * b * D        # cl. 26.5.1.1 (b)
+    Ast = np.maximum(Ast_req, Ast_min)
+
+    # Shear (cl. 40)
+    pt = 100 * Ast / (b * d)
+    tau_v = Vu * 1e3 / (b * d)
+    tc = tau_c(pt, fck)
+    tc_max = tau_c_max(fck)
+    Asv = stirrup_legs * np.pi * stirrup_dia ** 2 / 4
+    Vus = np.maximum(tau_v - tc, 0) * b * d
+    with np.errstate(divide="ignore"):
+        sv_shear = np.where(Vus > 0, 0.87 * fy_stirrup * Asv * d / np.where(Vus > 0, Vus, 1), np.inf)
+    sv_min_steel = 0.87 * fy_stirrup * Asv / (0.4 * b)   # cl. 26.5.1.6
+    sv_max = np.minimum(0.75 * d, 300)                   # cl. 26.5.1.5
+    sv = np.floor(np.minimum(np.minimum(sv_shear, sv_min_steel), sv_max) / 25) * 25
+
+    return {
+        "d": d,
+        "Mu_lim": Mu_lim,
+        "over_reinforced": over_reinforced,
+        "Ast_required": Ast_req,
+        "Ast_min": Ast_min,
+        "Ast_max": Ast_max,
+        "Ast": Ast,
+        "Ast_ok": (Ast <= Ast_max) & ~over_reinforced,
+        "pt": pt,
+        "tau_v": tau_v,
+        "tau_c": tc,
+        "tau_c_max": tc_max,
+        "shear_ok": tau_v <= tc_max,
+        "Asv": np.full_like(d, Asv),
+        "stirrup_spacing": sv,
+    }
+
+
+def steel_quantities(b, D, L, Ast, stirrup_spacing, hanger_area=226, clear_cover=25,
+                     stirrup_dia=8, stirrup_legs=2):
+    """Steel weights (kg) for a batch of beams of span ``L`` (m).
+
+    Longitudinal steel is the tension steel plus hanger bars (default
+    2 × 12 mm) over the full span; stirrups are counted at the design
+    spacing with 10·φ hooks at each end.
+    """
+    b, D, L, Ast, sv = np.broadcast_arrays(*(np.asarray(v, dtype=float)
+                                             for v in (b, D, L, Ast, stirrup_spacing)))
+    bar_area = np.pi * stirrup_dia ** 2 / 4
+    longitudinal = (Ast + hanger_area) * 1e-6 * L * STEEL_DENSITY
+    count = np.floor(L * 1000 / np.maximum(sv, 1)) + 1
+    stirrup_length = 2 * ((b - 2 * clear_cover) + (D - 2 * clear_cover)) + 2 * 10 * stirrup_dia
+    stirrups = count * stirrup_length * bar_area * stirrup_legs / 2 * 1e-9 * STEEL_DENSITY
+    return {
+        "longitudinal_weight": longitudinal,
+        "stirrup_count": count,
+        "stirrup_weight": stirrups,
+        "steel_weight": longitudinal + stirrups,
+    }
+
+
+def design_summary(b, D, L, M_max, V_max, material_key):
+    """Single-beam design for /calculate from service actions.
+
+    ``b``, ``D`` in mm, ``L`` in m, ``M_max`` (kN·m) and ``V_max`` (kN) are
+    unfactored; GAMMA_F is applied here. Returns plain floats/bools.
+    """
+    fck, fy = design_grades(material_key)
+    design = design_beams(b, D, GAMMA_F * M_max, GAMMA_F * V_max, fck, fy)
+    quantities = steel_quantities(b, D, L, design["Ast"], design["stirrup_spacing"])
+    summary = {key: value.item() for key, value in design.items()}
+    summary.update({key: value.item() for key, value in quantities.items()})
+    summary.update({"fck": fck, "fy": fy})
+    return summary
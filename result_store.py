@@ -0,0 +1,102 @@
+import json
+import threading
+from collections import OrderedDict
+
+from pymongo.errors import DuplicateKeyError
+
+from cost_engine import get_rates
+from singleflight import canonical_key
+
+# Content-addressed result store
+#
+# A calculation is identified by the hash of its canonical inputs, the cost
+# rates it was priced with (COST_RATES_FILE) and RESULT_VERSION, bumped whenever the
+# engine's numbers change. Its results
+# are written once to the `results` collection under that hash, with
+# $setOnInsert so re-saving identical inputs writes nothing; every save adds
+# only a small `projects` document (timestamp, user, result_id). Reads join
+# the two with $lookup. Older projects that still hold their full results
+# pass through the same views unchanged.
+
+RESULTS_COLLECTION = "results"
+RESULT_VERSION = 1
+INPUT_FIELDS = ("length", "loadType", "P", "a", "w", "w_max", "M_applied", "b", "d", "material")
+RESULT_FIELDS = ("results", "reinforcement", "cracked_section", "code_checks", "cost", "rates")
+KNOWN_KEYS = 4096  # result ids this process has already stored, to skip the upsert round trip
+
+_known = OrderedDict()
+_known_lock = threading.Lock()
+
+
+def result_key(beam_data):
+    """Hash of the inputs that determine a beam's results, including the cost rates it was priced with."""
+    inputs = {field: beam_data.get(field) for field in INPUT_FIELDS}
+    inputs["version"] = RESULT_VERSION
+    inputs["rates"] = json.dumps(beam_data.get("rates") or get_rates(), sort_keys=True)
+    return canonical_key(inputs)
+
+
+def _remember(key):
+    with _known_lock:
+        _known[key] = True
+        _known.move_to_end(key)
+        while len(_known) > KNOWN_KEYS:
+            _known.popitem(last=False)
+
+
+def store_result(db, beam_data):
+    """Store the results of ``beam_data`` once; returns (result_id, created)."""
+    key = result_key(beam_data)
+    with _known_lock:
+        if key in _known:
+            _known.move_to_end(key)
+            return key, False
+    doc = {field: beam_data.get(field) for field in INPUT_FIELDS + RESULT_FIELDS}
+    doc["created"] = beam_data["timestamp"]
+    doc["version"] = RESULT_VERSION
+    try:
+        created = db[RESULTS_COLLECTION].update_one({"_id": key}, {"$setOnInsert": doc}, upsert=True).upserted_id is not None
+    except DuplicateKeyError:
+        # A concurrent upsert of the same inputs won the insert
+        created = False
+    _remember(key)
+    return key, created
+
+
+def save_project(db, beam_data, user=None):
+    """Save a calculation as a reference to its stored results; returns (result_id, created)."""
+    key, created = store_result(db, beam_data)
+    db.projects.insert_one({
+        "_id": beam_data["_id"],
+        "timestamp": beam_data["timestamp"],
+        "user": user,
+        "result_id": key,
+    })
+    return key, created
+
+
+def project_view_stages():
+    """Aggregation stages that expand project references into full project documents."""
+    return [
+        {"$lookup": {"from": RESULTS_COLLECTION, "localField": "result_id", "foreignField": "_id", "as": "stored"}},
+        {"$unwind": {"path": "$stored", "preserveNullAndEmptyArrays": True}},
+        # Fields the project already holds (older full documents) win over the stored ones
+        {"$addFields": {
+            field: {"$ifNull": [f"${field}", f"$stored.{field}"]} for field in INPUT_FIELDS + RESULT_FIELDS
+        }},
+        {"$project": {"stored": 0}},
+    ]
+
+
+def load_project(db, project_id):
+    """A saved project with its stored results, or None."""
+    project = db.projects.find_one({"_id": project_id})
+    if project is None:
+        return None
+    if "result_id" not in project:
+        return project
+    stored = db[RESULTS_COLLECTION].find_one({"_id": project["result_id"]}) or {}
+    return {
+        **{field: stored.get(field) for field in INPUT_FIELDS + RESULT_FIELDS},
+        **project,
+    }
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Single-flight request coalescing
+#
+# Concurrent calls with the same key wait on one in-flight computation and
+# share its result. Successful results are also kept for a short window so
+# client retries and shared links arriving just after completion are served
+# without recomputing. Failures are never cached.
+
+
+def canonical_key(form):
+    """Stable hash of form inputs: sorted keys, trimmed values, numbers normalised, blanks dropped."""
+    items = []
+    for key in sorted(form.keys()):
+        values = form.getlist(key) if hasattr(form, "getlist") else [form[key]]
+        normalized = []
+        for value in values:
+            value = str(value).strip()
+            try:
+                value = repr(float(value))
+            except ValueError:
+                pass
+            if value:
+                normalized.append(value)
+        if normalized:
+            items.append([key, normalized])
+    return hashlib.sha256(json.dumps(items).encode()).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, window=2.0, max_entries=1024):
+        self.window = window
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._recent = OrderedDict()
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0, "window_hits": 0, "errors": 0}
+
+    def _prune(self, now):
+        while self._recent:
+            key, (expires, _) = next(iter(self._recent.items()))
+            if expires > now and len(self._recent) <= self.max_entries:
+                break
+            self._recent.popitem(last=False)
+
+    def do(self, key, fn):
+        """Return ``fn()``, sharing one execution among concurrent or recent callers with ``key``."""
+        with self._lock:
+            now = time.monotonic()
+            self._stats["calls"] += 1
+            self._prune(now)
+            if key in self._recent:
+                self._stats["window_hits"] += 1
+                return self._recent[key][1]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                self._stats["executions"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if call.error is None:
+                    self._recent[key] = (time.monotonic() + self.window, call.result)
+                else:
+                    self._stats["errors"] += 1
+            call.event.set()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._inflight)
+        stats["saved"] = stats["coalesced"] + stats["window_hits"]
+        return stats
@@ -1,3 +1,6 @@
+// Chart instances, kept so live slider mode can update them in place
+window.beamCharts = {};
+
 window.addEventListener("DOMContentLoaded", () => {
   const chartOptions = {
     responsive: true,
@@ -34,7 +37,7 @@ window.addEventListener("DOMContentLoaded", () => {
   if (typeof xData !== "undefined" && typeof vData !== "undefined") {
     const shearCanvas = document.getElementById("sfdChart");
     if (shearCanvas) {
-      new Chart(shearCanvas.getContext("2d"), {
+      window.beamCharts.sfd = new Chart(shearCanvas.getContext("2d"), {
         type: "line",
         data: {
           labels: xData,
@@ -74,7 +77,7 @@ window.addEventListener("DOMContentLoaded", () => {
   if (typeof xData !== "undefined" && typeof mData !== "undefined") {
     const momentCanvas = document.getElementById("bmdChart");
     if (momentCanvas) {
-      new Chart(momentCanvas.getContext("2d"), {
+      window.beamCharts.bmd = new Chart(momentCanvas.getContext("2d"), {
         type: "line",
         data: {
           labels: xData,
@@ -114,7 +117,7 @@ window.addEventListener("DOMContentLoaded", () => {
   if (typeof xData !== "undefined" && typeof deflection_vals !== "undefined" && deflection_vals.length > 0) {
     const deflectionCanvas = document.getElementById("deflectionChart");
     if (deflectionCanvas) {
-      new Chart(deflectionCanvas.getContext("2d"), {
+      window.beamCharts.deflection = new Chart(deflectionCanvas.getContext("2d"), {
         type: "line",
         data: {
           labels: xData,
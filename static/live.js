@@ -0,0 +1,107 @@
+// Live slider mode: send the slider state, redraw SFD/BMD/deflection from the returned delta
+const LOAD_FIELD = { point_center: "P", point_anywhere: "P", udl: "w", uvl: "w_max", moment: "M_applied" };
+
+const liveMode = {
+  clientId: Math.random().toString(36).slice(2) + Date.now().toString(36),
+  inputs: {},
+  stateId: null,
+  digests: {},
+  latest: {},
+  dirty: false,
+  sending: false,
+
+  // Page state from the last /calculate, in form units (m, mm, kN)
+  initialState() {
+    const data = window.beamData;
+    const loadField = LOAD_FIELD[data.loadType];
+    const state = {
+      length: data.length,
+      loadType: data.loadType,
+      material: data.material,
+      b: data.b,
+      d: data.d,
+      a: data.a
+    };
+    if (loadField) state[loadField] = data[loadField] / 1000;
+    return state;
+  },
+
+  start() {
+    this.inputs = this.initialState();
+    // The page already shows the /calculate charts; the first update fills in digests
+    document.querySelectorAll("[data-live-field]").forEach(slider => {
+      const field = slider.dataset.liveField === "load" ? LOAD_FIELD[this.inputs.loadType] : slider.dataset.liveField;
+      if (!field) return;
+      slider.value = this.inputs[field];
+      this.showValue(slider);
+      slider.addEventListener("input", () => {
+        this.showValue(slider);
+        this.send({ [field]: slider.value });
+      });
+    });
+  },
+
+  showValue(slider) {
+    const label = document.getElementById(`${slider.id}Value`);
+    if (label) label.textContent = slider.value;
+  },
+
+  // At most one request in flight; slider moves made meanwhile are merged
+  // into the next request, which always carries the complete latest state
+  async send(changes) {
+    this.inputs = { ...this.inputs, ...changes };
+    this.dirty = true;
+    if (this.sending) return;
+    this.sending = true;
+    while (this.dirty) {
+      this.dirty = false;
+      try {
+        const response = await fetch(`/live/${this.clientId}/update`, {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify({ inputs: this.inputs, state_id: this.stateId, digests: this.digests })
+        });
+        if (response.status === 429) {
+          this.dirty = true;
+          await new Promise(resolve => setTimeout(resolve, 100));
+          continue;
+        }
+        const payload = await response.json();
+        if (payload.delta) {
+          this.stateId = payload.state_id;
+          this.digests = payload.digests;
+          this.apply(payload.delta);
+        }
+      } catch (error) {
+        console.error("Live update error:", error);
+      }
+    }
+    this.sending = false;
+  },
+
+  apply(delta) {
+    const charts = window.beamCharts || {};
+    const series = { V_vals: charts.sfd, M_vals: charts.bmd, deflection_vals: charts.deflection };
+    Object.values(charts).forEach(chart => {
+      if (chart && delta.x_vals) chart.data.labels = delta.x_vals;
+    });
+    Object.entries(series).forEach(([key, chart]) => {
+      if (chart && delta[key]) chart.data.datasets[0].data = delta[key];
+    });
+    Object.values(charts).forEach(chart => chart && chart.update("none"));
+
+    this.latest = { ...this.latest, ...delta };
+    const latest = this.latest;
+    const status = document.getElementById("liveStatus");
+    if (status && latest.stress !== undefined) {
+      status.textContent = `Stress ${latest.stress} MPa (ratio ${latest.stress_ratio}), ` +
+        `deflection ${latest.deflection} mm (ratio ${latest.deflection_ratio})`;
+    }
+  }
+};
+
+window.addEventListener("DOMContentLoaded", () => {
+  if (window.beamData && document.getElementById("livePanel")) {
+    liveMode.start();
+  }
+});
@@ -50,16 +50,46 @@ async function askAssistant() {
   responseBox.innerText = "🧠 Thinking...";
 
   try {
-    const response = await fetch("/chat", {
+    const response = await fetch("/chat/stream", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify({ message: input })
     });
 
-    const data = await response.json();
-    responseBox.innerText = data?.response
-      ? `💡 ${data.response}`
-      : "❌ No response from assistant.";
+    if (!response.ok || !response.body) {
+      const data = await response.json();
+      responseBox.innerText = data?.response ? `💡 ${data.response}` : "❌ No response from assistant.";
+      return;
+    }
+
+    // Render tokens as they arrive from the server-sent event stream
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let answer = "";
+    let citations = [];
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const frames = buffer.split("\n\n");
+      buffer = frames.pop();
+      for (const frame of frames) {
+        if (!frame.startsWith("data: ")) continue;
+        const event = JSON.parse(frame.slice(6));
+        if (event.type === "meta") {
+          citations = event.citations || [];
+        } else if (event.type === "token" || event.type === "error") {
+          answer += event.text;
+          responseBox.innerText = `💡 ${answer}`;
+        }
+      }
+    }
+    if (!answer) {
+      responseBox.innerText = "❌ No response from assistant.";
+    } else if (citations.length > 1) {
+      responseBox.innerText += `\n\n🔗 See also: ${citations.slice(1).map(c => c.citation).join(", ")}`;
+    }
   } catch (error) {
     console.error("Assistant error:", error);
     responseBox.innerText = "❌ Assistant error. Please try again.";
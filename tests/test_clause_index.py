@@ -0,0 +1,46 @@
+import pytest
+
+from clause_index import _stem, answer_from_clauses
+
+
+@pytest.mark.parametrize("plural, singular", [
+    ("stresses", "stress"), ("shapes", "shape"), ("bars", "bar"), ("boxes", "box"),
+    ("inches", "inch"), ("meshes", "mesh"), ("classes", "class"), ("storeys", "storey"), ("ties", "tie"),
+])
+def test_stem_maps_plural_to_singular(plural, singular):
+    assert _stem(plural) == _stem(singular)
+
+
+@pytest.mark.parametrize("question, clause_id", [
+    ("What does M20 mean", "faq-grade"),
+    ("What do M20 and M25 mean?", "faq-grade"),
+    ("how much cover for a beam", "is456-26.4"),
+    ("What is the deflection limit for a beam?", "is456-23.2"),
+    ("span to depth ratio for cantilever", "is456-23.2.1"),
+    ("minimum reinforcement in beam", "is456-26.5.1.1"),
+    ("max spacing of stirrups", "is456-26.5.1.5"),
+    ("design of stirrups", "is456-40.4"),
+    ("side face reinforcement", "is456-26.5.1.3"),
+    ("clear spacing between bars", "is456-26.3.2"),
+    ("development length", "is456-26.2.1"),
+    ("effective span", "is456-22.2"),
+    ("shear stress limit for M25", "is456-table20"),
+    ("bending stress formula", "faq-bending-stress"),
+    ("why is the BMD parabolic for udl", "faq-bmd-udl"),
+    ("how to reduce deflection", "faq-reduce-deflection"),
+    ("modulus of elasticity of concrete", "is456-6.2.3.1"),
+    ("unit weight of concrete", "is875-1"),
+    ("live load for office floors", "is875-2"),
+    ("partial safety factor for steel", "is456-36.4.2"),
+    ("load combinations", "is456-table18"),
+    ("minimum grade of concrete for severe exposure", "is456-table5"),
+    # No clause covers these: they go to the LLM
+    ("What is the maximum stress allowed?", None),
+    ("how much does a beam cost", None),
+    ("what beam size for a 6 m span", None),
+    ("what is the capital of France", None),
+    ("best pizza near me", None),
+])
+def test_answers_from_bundled_clauses(question, clause_id):
+    answer = answer_from_clauses(question)
+    assert (answer["citations"][0]["id"] if answer else None) == clause_id
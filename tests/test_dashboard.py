@@ -0,0 +1,111 @@
+import datetime
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from pymongo import UpdateOne
+
+import dashboard
+import result_store
+from result_store import save_project
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(result_store, "_known", type(result_store._known)())
+    return mongomock.MongoClient().db
+
+
+def _beam(project_id, day, material, w, stress_ratio, deflection_ratio, total_cost):
+    return {
+        "_id": project_id,
+        "timestamp": datetime.datetime(2026, 10, day, 12),
+        "length": 6.0, "loadType": "udl", "P": 0, "a": 0, "w": w, "w_max": 0, "M_applied": 0,
+        "b": 300.0, "d": 450.0, "material": material,
+        "results": {"stress_ok": stress_ratio <= 1, "deflection_ok": deflection_ratio <= 1,
+                    "stress_ratio": stress_ratio, "deflection_ratio": deflection_ratio},
+        "cost": {"total_cost": total_cost},
+        "rates": {"concrete": 1},
+    }
+
+
+def _record(db, beam_data):
+    # Same changes record_project sends; mongomock cannot run pymongo 4.x bulk
+    # operations, so they are applied one by one here
+    for query, update in dashboard.summary_changes(beam_data):
+        db[dashboard.SUMMARY_COLLECTION].update_one(query, update, upsert=True)
+
+
+def _save(db, beam_data, user="u1"):
+    save_project(db, beam_data, user)
+    _record(db, beam_data)
+
+
+@pytest.fixture
+def projects(db):
+    _save(db, _beam("p1", 1, "M20", 20, 0.3, 0.1, 100.0))
+    _save(db, _beam("p2", 1, "M25", 20, 0.6, 0.2, 200.0))
+    # Same inputs from another user: one stored result, two projects
+    _save(db, _beam("p3", 2, "M25", 20, 0.6, 0.2, 200.0), user="u2")
+    _save(db, _beam("p4", 3, "M25", 60, 1.7, 0.9, 300.0))
+    # Older project holding its full results, no result_id
+    legacy = _beam("legacy", 3, "M20", 10, 0.2, 1.3, 50.0)
+    db.projects.insert_one(legacy)
+    _record(db, legacy)
+    return db
+
+
+def test_project_references_share_results(projects):
+    assert projects.projects.count_documents({}) == 5
+    assert projects[result_store.RESULTS_COLLECTION].count_documents({}) == 3
+    assert result_store.load_project(projects, "p3")["cost"] == {"total_cost": 200.0}
+
+
+def test_aggregation_matches_summaries(projects):
+    aggregated = dashboard.aggregate_dashboard(projects)
+    assert aggregated == dashboard.read_summaries(projects)
+
+    by_material = {row["material"]: row for row in aggregated["by_material"]}
+    assert by_material["M25"]["count"] == 3 and by_material["M25"]["fail"] == 1
+    assert by_material["M20"]["deflection_fail"] == 1
+    assert [row["total_cost"] for row in aggregated["cost_per_day"]] == [300.0, 200.0, 350.0]
+    assert aggregated["stress_ratio"] == [
+        {"bucket": 0, "count": 1}, {"bucket": 0.25, "count": 1}, {"bucket": 0.5, "count": 2}, {"bucket": 1.5, "count": 1},
+    ]
+
+
+def test_rebuild_replaces_summaries(projects):
+    expected = dashboard.read_summaries(projects)
+    # Drifted counters, e.g. from a failed $inc
+    projects[dashboard.SUMMARY_COLLECTION].update_one({"_id": "material:M25"}, {"$inc": {"count": 5}})
+    projects[dashboard.SUMMARY_COLLECTION].insert_one({"_id": "day:1999-01-01", "kind": "day", "key": "1999-01-01",
+                                                       "count": 1, "total_cost": 1.0})
+
+    assert dashboard.rebuild_summaries(projects) == projects[dashboard.SUMMARY_COLLECTION].count_documents({})
+    assert dashboard.read_summaries(projects) == expected
+    assert dashboard.REBUILD_COLLECTION not in projects.list_collection_names()
+
+
+def test_rebuild_without_projects(db):
+    db[dashboard.SUMMARY_COLLECTION].insert_one({"_id": "day:2026-10-01", "kind": "day", "key": "2026-10-01",
+                                                 "count": 1, "total_cost": 1.0})
+    assert dashboard.rebuild_summaries(db) == 0
+    assert dashboard.read_summaries(db)["cost_per_day"] == []
+
+
+class RecordingCollection:
+    def __init__(self):
+        self.calls = []
+
+    def bulk_write(self, requests, ordered=True):
+        self.calls.append((requests, ordered))
+
+
+def test_record_project_is_one_unordered_bulk_write():
+    summaries = RecordingCollection()
+    beam = _beam("p1", 1, "M20", 20, 0.3, 1.2, 100.0)
+    dashboard.record_project({dashboard.SUMMARY_COLLECTION: summaries}, beam)
+    assert summaries.calls == [
+        ([UpdateOne(query, update, upsert=True) for query, update in dashboard.summary_changes(beam)], False),
+    ]
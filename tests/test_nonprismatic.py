@@ -0,0 +1,36 @@
+import math
+
+import numpy as np
+import pytest
+
+from beam_logic import profile_at
+from nonprismatic import solve_nonprismatic
+
+L, E, I = 6.0, 25e9, 2.278e-3
+EI = E * I
+
+
+@pytest.mark.parametrize("load_type, params", [
+    ("udl", {"w": 20000}),
+    ("point_center", {"P": 50000}),
+    ("point_anywhere", {"P": 50000, "a": 2.0}),
+])
+def test_prismatic_matches_closed_form(load_type, params):
+    result = solve_nonprismatic(L, load_type, params, I, E, n_stations=2001)
+    _, _, closed_form = profile_at(result["x"], L, load_type, params, E, I)
+    error = np.abs(result["deflection"] - closed_form).max() / np.abs(closed_form).max()
+    assert error < 1e-6
+
+
+# beam_logic's uvl profile (x²(5L² − x²) / 120EIL) and end-moment profile (zero)
+# are not the simply supported solutions, so these compare with the exact maxima
+def test_prismatic_uvl_matches_exact_maximum():
+    result = solve_nonprismatic(L, "uvl", {"w_max": 20000}, I, E, n_stations=2001)
+    exact = 0.00652 * 20000 * L ** 4 / EI * 1000
+    assert result["max_deflection"] == pytest.approx(exact, rel=1e-3)
+
+
+def test_prismatic_end_moment_matches_exact_maximum():
+    result = solve_nonprismatic(L, "moment", {"M_applied": 30000}, I, E, n_stations=2001)
+    exact = 30000 * L ** 2 / (9 * math.sqrt(3) * EI) * 1000
+    assert abs(result["max_deflection"]) == pytest.approx(exact, rel=1e-4)
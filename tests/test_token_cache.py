@@ -0,0 +1,121 @@
+import base64
+import json
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+from loadtest.stubs import LocalTokenIssuer
+from token_cache import TokenVerifier
+
+
+class Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(scope="module")
+def issuer(tmp_path_factory):
+    return LocalTokenIssuer(key_file=str(tmp_path_factory.mktemp("keys") / "key.pem"), project_id="beam-test")
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def verifier(issuer, clock):
+    verifier = TokenVerifier(issuer.project_id, fetch_keys=issuer.keys, clock=clock)
+    verifier.refresh_keys()
+    return verifier
+
+
+def _unsigned(header, claims):
+    encode = lambda value: base64.urlsafe_b64encode(json.dumps(value).encode()).rstrip(b"=").decode()
+    return f"{encode(header)}.{encode(claims)}.c2lnbmF0dXJl"
+
+
+def test_repeat_token_is_a_cache_hit(issuer, verifier):
+    token = issuer.issue("alice")
+    assert verifier.verify(token)["uid"] == "alice"
+    assert verifier.verify(token)["uid"] == "alice"
+    stats = verifier.stats()
+    assert (stats["local"], stats["hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_entry_is_dropped_at_exp(issuer, verifier, clock):
+    token = issuer.issue("alice", lifetime=60)
+    exp = verifier.verify(token)["exp"]
+    clock.now = exp - 1
+    verifier.verify(token)
+    assert verifier.stats()["hits"] == 1
+    clock.now = exp
+    verifier.verify(token)  # re-verified: jwt.decode checks exp against the real clock
+    stats = verifier.stats()
+    assert (stats["hits"], stats["expired"], stats["local"]) == (1, 1, 2)
+
+
+def test_lru_stays_at_max_size(issuer, clock):
+    verifier = TokenVerifier(issuer.project_id, fetch_keys=issuer.keys, clock=clock, max_size=3)
+    verifier.refresh_keys()
+    tokens = [issuer.issue(f"user{i}") for i in range(5)]
+    for token in tokens:
+        verifier.verify(token)
+    assert verifier.stats()["size"] == 3
+    verifier.verify(tokens[-1])
+    assert verifier.stats()["hits"] == 1
+    verifier.verify(tokens[0])  # evicted, verified again
+    assert verifier.stats()["local"] == 6
+
+
+@pytest.mark.parametrize("claims", [
+    {"aud": "another-project"},
+    {"iss": "https://securetoken.google.com/another-project"},
+    {"auth_time": int(time.time()) + 3600},
+])
+def test_wrong_claims_are_rejected(issuer, verifier, claims):
+    with pytest.raises(ValueError):
+        verifier.verify(issuer.issue("mallory", **claims))
+    assert verifier.stats()["failures"] == 1
+
+
+def test_wrong_algorithm_is_rejected(issuer, verifier):
+    now = int(time.time())
+    token = _unsigned(
+        {"alg": "HS256", "typ": "JWT", "kid": issuer.key_id},
+        {"iss": "https://securetoken.google.com/beam-test", "aud": "beam-test", "sub": "mallory",
+         "iat": now, "exp": now + 3600},
+    )
+    with pytest.raises(ValueError, match="algorithm"):
+        verifier.verify(token)
+
+
+def test_unknown_kid_uses_fallback_and_refreshes_keys(issuer, clock):
+    fetched = threading.Event()
+    fallback_calls = []
+
+    def fetch_keys():
+        fetched.set()
+        return issuer.keys()
+
+    def fallback(token):
+        fallback_calls.append(token)
+        return {"uid": "bob", "sub": "bob", "exp": clock() + 3600}
+
+    verifier = TokenVerifier(issuer.project_id, fetch_keys=fetch_keys, fallback=fallback, clock=clock)
+    verifier.start()
+    assert fetched.wait(5)
+    # The refresher now sleeps until near max-age; only a trigger wakes it early
+    time.sleep(0.1)
+    fetched.clear()
+    token = issuer.issue("bob", key_id="rotated-key")
+    assert verifier.verify(token)["uid"] == "bob"
+    assert fallback_calls == [token]
+    assert verifier.stats()["fallback"] == 1
+    assert fetched.wait(5), "unknown kid did not trigger a key refresh"
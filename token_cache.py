@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+
+from google.auth import jwt
+
+# Local Firebase ID-token verification with a verified-token cache
+#
+# Firebase ID tokens are RS256 JWTs signed with Google's rotating securetoken
+# keys. The keys are fetched by a background thread and refreshed before
+# their Cache-Control max-age runs out, so a request never waits on a key
+# fetch: tokens are checked locally (signature, audience, issuer, expiry).
+# Verified claims are kept in an LRU keyed by the token's SHA-256 until the
+# token's own exp, so repeat login pings cost a hash and a dict lookup.
+# Until keys are available, or for a key id not seen yet, verification falls
+# back to the Firebase Admin SDK (and a refresh is triggered).
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+ISSUER_PREFIX = "https://securetoken.google.com/"
+CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+REFRESH_MARGIN = 300     # seconds before key expiry to refresh
+RETRY_INTERVAL = 60      # seconds between attempts after a failed fetch
+DEFAULT_MAX_AGE = 3600   # when the response carries no max-age
+CLOCK_SKEW = 5           # seconds of tolerance on iat / exp
+
+
+def fetch_google_certs(url=GOOGLE_CERTS_URL, timeout=10):
+    """Current signing certificates as ({kid: PEM}, max_age seconds)."""
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        certs = json.loads(response.read())
+        match = re.search(r"max-age=(\d+)", response.headers.get("Cache-Control", ""))
+    return certs, int(match.group(1)) if match else DEFAULT_MAX_AGE
+
+
+def token_hash(id_token):
+    return hashlib.sha256(id_token.encode()).hexdigest()
+
+
+class TokenVerifier:
+    def __init__(self, project_id, fetch_keys=fetch_google_certs, fallback=None,
+                 max_size=CACHE_SIZE, clock=time.time):
+        self.project_id = project_id
+        self.fetch_keys = fetch_keys
+        self.fallback = fallback
+        self.max_size = max_size
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._keys = {}
+        self._keys_expire = 0.0
+        self._refresh = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "local": 0, "fallback": 0, "failures": 0,
+                       "key_refreshes": 0, "key_errors": 0}
+
+    # 1. Signing keys
+    def refresh_keys(self):
+        """Fetch the signing keys now; returns seconds until they should be refreshed again."""
+        try:
+            keys, max_age = self.fetch_keys()
+        except Exception as e:
+            print(f"⚠️ Could not refresh token signing keys: {e}")
+            with self._lock:
+                self._stats["key_errors"] += 1
+            return RETRY_INTERVAL
+        with self._lock:
+            self._keys = dict(keys)
+            self._keys_expire = self.clock() + max_age
+            self._stats["key_refreshes"] += 1
+        return max(max_age - REFRESH_MARGIN, RETRY_INTERVAL)
+
+    def _refresh_loop(self):
+        while True:
+            wait = self.refresh_keys()
+            self._refresh.wait(wait)
+            self._refresh.clear()
+
+    def start(self):
+        """Start the background key refresher (again after a fork, where threads do not survive)."""
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._refresh_loop, name="token-keys", daemon=True)
+            self._thread.start()
+
+    # 2. Verification
+    def verify(self, id_token):
+        """Claims of a valid Firebase ID token (with "uid"); raises ValueError otherwise."""
+        self.start()
+        key = token_hash(id_token)
+        now = self.clock()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                claims, expires = entry
+                if expires > now:
+                    self._cache.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return claims
+                del self._cache[key]
+                self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            keys = self._keys
+
+        try:
+            header = jwt.decode_header(id_token)
+            if header.get("kid") in keys:
+                claims = self._verify_locally(id_token, header, keys)
+                source = "local"
+            elif self.fallback is not None:
+                # Keys not loaded yet or rotated since the last fetch
+                self._refresh.set()
+                claims = dict(self.fallback(id_token))
+                source = "fallback"
+            else:
+                self._refresh.set()
+                raise ValueError("Signing key not available")
+        except Exception:
+            with self._lock:
+                self._stats["failures"] += 1
+            raise
+
+        claims.setdefault("uid", claims.get("sub"))
+        with self._lock:
+            self._stats[source] += 1
+            self._cache[key] = (claims, float(claims.get("exp", now)))
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return claims
+
+    def _verify_locally(self, id_token, header, keys):
+        if header.get("alg") != "RS256":
+            raise ValueError(f"Unexpected token algorithm {header.get('alg')}")
+        # Checks the signature against the key named by kid, plus aud, iat and exp
+        claims = jwt.decode(id_token, certs=keys, audience=self.project_id, clock_skew_in_seconds=CLOCK_SKEW)
+        if claims.get("iss") != ISSUER_PREFIX + self.project_id:
+            raise ValueError("Token has the wrong issuer")
+        subject = claims.get("sub")
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise ValueError("Token has an invalid subject")
+        if claims.get("auth_time", 0) > self.clock() + CLOCK_SKEW:
+            raise ValueError("Token auth_time is in the future")
+        return claims
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._cache)
+            stats["keys"] = len(self._keys)
+            stats["keys_ttl"] = max(self._keys_expire - self.clock(), 0.0) if self._keys else None
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats